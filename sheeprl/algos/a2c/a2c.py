@@ -11,7 +11,7 @@ from torch.utils.data import BatchSampler, DistributedSampler, RandomSampler
 from torchmetrics import SumMetric
 
 from sheeprl.algos.a2c.loss import policy_loss
-from sheeprl.algos.ppo.agent import PPOAgent, build_agent
+from sheeprl.algos.ppo.agent import PPOAgent, build_agent, fuse_heads_optimizer_state
 from sheeprl.algos.ppo.loss import entropy_loss, value_loss
 from sheeprl.algos.ppo.utils import normalize_obs, prepare_obs, test
 from sheeprl.data import ReplayBuffer
@@ -196,7 +196,7 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
 
     # Load the state from the checkpoint
     if cfg.checkpoint.resume_from:
-        optimizer.load_state_dict(state["optimizer"])
+        optimizer.load_state_dict(fuse_heads_optimizer_state(agent, state["agent"], state["optimizer"]))
 
     # Setup agent and optimizer with Fabric
     optimizer = fabric.setup_optimizers(optimizer)
@@ -349,7 +349,9 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                             fabric.print(f"Rank-0: policy_step={policy_step}, reward_env_{i}={ep_rew[-1]}")
 
         # Transform the data into PyTorch Tensors
-        local_data = rb.to_tensor(dtype=None, device=device, from_numpy=cfg.buffer.from_numpy)
+        local_data = rb.to_tensor(
+            dtype=None, device=device, from_numpy=cfg.buffer.from_numpy, pin_memory=cfg.buffer.pin_memory
+        )
 
         # Estimate returns with GAE (https://arxiv.org/abs/1506.02438)
         with torch.inference_mode():
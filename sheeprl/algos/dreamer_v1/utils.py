@@ -18,24 +18,26 @@ if TYPE_CHECKING:
     from mlflow.models.model import ModelInfo
 
 
-AGGREGATOR_KEYS = {
-    "Rewards/rew_avg",
-    "Game/ep_len_avg",
-    "Loss/world_model_loss",
-    "Loss/value_loss",
-    "Loss/policy_loss",
-    "Loss/observation_loss",
-    "Loss/reward_loss",
-    "Loss/state_loss",
-    "Loss/continue_loss",
-    "State/post_entropy",
-    "State/prior_entropy",
-    "State/kl",
-    "Grads/world_model",
-    "Grads/actor",
-    "Grads/critic",
-    "Params/exploration_amount",
-}
+AGGREGATOR_KEYS = frozenset(
+    {
+        "Rewards/rew_avg",
+        "Game/ep_len_avg",
+        "Loss/world_model_loss",
+        "Loss/value_loss",
+        "Loss/policy_loss",
+        "Loss/observation_loss",
+        "Loss/reward_loss",
+        "Loss/state_loss",
+        "Loss/continue_loss",
+        "State/post_entropy",
+        "State/prior_entropy",
+        "State/kl",
+        "Grads/world_model",
+        "Grads/actor",
+        "Grads/critic",
+        "Params/exploration_amount",
+    }
+)
 MODELS_TO_REGISTER = {"world_model", "actor", "critic"}
 
 
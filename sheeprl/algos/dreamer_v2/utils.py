@@ -21,23 +21,25 @@ if TYPE_CHECKING:
     from sheeprl.algos.dreamer_v2.agent import PlayerDV2
 
 
-AGGREGATOR_KEYS = {
-    "Rewards/rew_avg",
-    "Game/ep_len_avg",
-    "Loss/world_model_loss",
-    "Loss/value_loss",
-    "Loss/policy_loss",
-    "Loss/observation_loss",
-    "Loss/reward_loss",
-    "Loss/state_loss",
-    "Loss/continue_loss",
-    "State/post_entropy",
-    "State/prior_entropy",
-    "State/kl",
-    "Grads/world_model",
-    "Grads/actor",
-    "Grads/critic",
-}
+AGGREGATOR_KEYS = frozenset(
+    {
+        "Rewards/rew_avg",
+        "Game/ep_len_avg",
+        "Loss/world_model_loss",
+        "Loss/value_loss",
+        "Loss/policy_loss",
+        "Loss/observation_loss",
+        "Loss/reward_loss",
+        "Loss/state_loss",
+        "Loss/continue_loss",
+        "State/post_entropy",
+        "State/prior_entropy",
+        "State/kl",
+        "Grads/world_model",
+        "Grads/actor",
+        "Grads/critic",
+    }
+)
 MODELS_TO_REGISTER = {"world_model", "actor", "critic", "target_critic"}
 
 
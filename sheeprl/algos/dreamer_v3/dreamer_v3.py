@@ -668,6 +668,7 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                     dtype=None,
                     device=fabric.device,
                     from_numpy=cfg.buffer.from_numpy,
+                    pin_memory=cfg.buffer.pin_memory,
                 )
                 with timer("Time/train_time", SumMetric, sync_on_compute=cfg.metric.sync_on_compute):
                     for i in range(per_rank_gradient_steps):
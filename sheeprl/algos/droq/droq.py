@@ -45,6 +45,7 @@ def train(
         per_rank_gradient_steps * cfg.algo.per_rank_batch_size,
         sample_next_obs=cfg.buffer.sample_next_obs,
         from_numpy=cfg.buffer.from_numpy,
+        pin_memory=cfg.buffer.pin_memory,
     )
     critic_data: Dict[str, torch.Tensor] = fabric.all_gather(sample)  # [World, G*B]
     for k, v in critic_data.items():
@@ -70,7 +71,9 @@ def train(
         critic_sampler = BatchSampler(sampler=critic_idxes, batch_size=cfg.algo.per_rank_batch_size, drop_last=False)
 
     # Sample a different minibatch in a distributed way to update actor and alpha parameter
-    sample = rb.sample_tensors(cfg.algo.per_rank_batch_size, from_numpy=cfg.buffer.from_numpy)
+    sample = rb.sample_tensors(
+        cfg.algo.per_rank_batch_size, from_numpy=cfg.buffer.from_numpy, pin_memory=cfg.buffer.pin_memory
+    )
     actor_data = fabric.all_gather(sample)
     for k, v in actor_data.items():
         actor_data[k] = v.float()  # [G*B*World]
@@ -340,6 +340,7 @@ def main(fabric: Fabric, cfg: Dict[str, Any], exploration_cfg: Dict[str, Any]):
                         dtype=None,
                         device=device,
                         from_numpy=cfg.buffer.from_numpy,
+                        pin_memory=cfg.buffer.pin_memory,
                     )  # [N_samples, Seq_len, Batch_size, ...]
                     for i in range(per_rank_gradient_steps):
                         batch = {k: v[i].float() for k, v in sample.items()}
@@ -13,32 +13,34 @@ from sheeprl.utils.utils import unwrap_fabric
 if TYPE_CHECKING:
     from mlflow.models.model import ModelInfo
 
-AGGREGATOR_KEYS = {
-    "Rewards/rew_avg",
-    "Game/ep_len_avg",
-    "Loss/world_model_loss",
-    "Loss/value_loss_task",
-    "Loss/policy_loss_task",
-    "Loss/value_loss_exploration",
-    "Loss/policy_loss_exploration",
-    "Loss/observation_loss",
-    "Loss/reward_loss",
-    "Loss/state_loss",
-    "Loss/continue_loss",
-    "Loss/ensemble_loss",
-    "State/kl",
-    "State/post_entropy",
-    "State/prior_entropy",
-    "Rewards/intrinsic",
-    "Values_exploration/predicted_values",
-    "Values_exploration/lambda_values",
-    "Grads/world_model",
-    "Grads/actor_task",
-    "Grads/critic_task",
-    "Grads/actor_exploration",
-    "Grads/critic_exploration",
-    "Grads/ensemble",
-}.union(AGGREGATOR_KEYS_DV2)
+AGGREGATOR_KEYS = frozenset(
+    {
+        "Rewards/rew_avg",
+        "Game/ep_len_avg",
+        "Loss/world_model_loss",
+        "Loss/value_loss_task",
+        "Loss/policy_loss_task",
+        "Loss/value_loss_exploration",
+        "Loss/policy_loss_exploration",
+        "Loss/observation_loss",
+        "Loss/reward_loss",
+        "Loss/state_loss",
+        "Loss/continue_loss",
+        "Loss/ensemble_loss",
+        "State/kl",
+        "State/post_entropy",
+        "State/prior_entropy",
+        "Rewards/intrinsic",
+        "Values_exploration/predicted_values",
+        "Values_exploration/lambda_values",
+        "Grads/world_model",
+        "Grads/actor_task",
+        "Grads/critic_task",
+        "Grads/actor_exploration",
+        "Grads/critic_exploration",
+        "Grads/ensemble",
+    }
+).union(AGGREGATOR_KEYS_DV2)
 MODELS_TO_REGISTER = {
     "world_model",
     "ensembles",
@@ -906,6 +906,7 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                     dtype=None,
                     device=fabric.device,
                     from_numpy=cfg.buffer.from_numpy,
+                    pin_memory=cfg.buffer.pin_memory,
                 )
                 # Start training
                 with timer("Time/train_time", SumMetric, sync_on_compute=cfg.metric.sync_on_compute):
@@ -15,33 +15,35 @@ if TYPE_CHECKING:
     from mlflow.models.model import ModelInfo
 
 
-AGGREGATOR_KEYS = {
-    "Rewards/rew_avg",
-    "Game/ep_len_avg",
-    "Loss/world_model_loss",
-    "Loss/policy_loss_task",
-    "Loss/value_loss_task",
-    "Loss/policy_loss_exploration",
-    "Loss/observation_loss",
-    "Loss/reward_loss",
-    "Loss/state_loss",
-    "Loss/continue_loss",
-    "Loss/ensemble_loss",
-    "State/kl",
-    "State/post_entropy",
-    "State/prior_entropy",
-    "Grads/world_model",
-    "Grads/actor_task",
-    "Grads/critic_task",
-    "Grads/actor_exploration",
-    "Grads/ensemble",
-    # General key name for the exploration critics.
-    "Loss/value_loss_exploration",
-    "Values_exploration/predicted_values",
-    "Values_exploration/lambda_values",
-    "Grads/critic_exploration",
-    "Rewards/intrinsic",
-}.union(AGGREGATOR_KEYS_DV3)
+AGGREGATOR_KEYS = frozenset(
+    {
+        "Rewards/rew_avg",
+        "Game/ep_len_avg",
+        "Loss/world_model_loss",
+        "Loss/policy_loss_task",
+        "Loss/value_loss_task",
+        "Loss/policy_loss_exploration",
+        "Loss/observation_loss",
+        "Loss/reward_loss",
+        "Loss/state_loss",
+        "Loss/continue_loss",
+        "Loss/ensemble_loss",
+        "State/kl",
+        "State/post_entropy",
+        "State/prior_entropy",
+        "Grads/world_model",
+        "Grads/actor_task",
+        "Grads/critic_task",
+        "Grads/actor_exploration",
+        "Grads/ensemble",
+        # General key name for the exploration critics.
+        "Loss/value_loss_exploration",
+        "Values_exploration/predicted_values",
+        "Values_exploration/lambda_values",
+        "Grads/critic_exploration",
+        "Rewards/intrinsic",
+    }
+).union(AGGREGATOR_KEYS_DV3)
 MODELS_TO_REGISTER = {
     "world_model",
     "ensembles",
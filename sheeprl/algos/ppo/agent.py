@@ -12,11 +12,26 @@ from lightning import Fabric
 from torch import Tensor
 from torch.distributions import Distribution, Independent, Normal, OneHotCategorical
 
-from sheeprl.models.models import MLP, MultiEncoder, NatureCNN
+from sheeprl.models.models import CNN, MLP, MultiEncoder, NatureCNN
 from sheeprl.utils.fabric import get_single_device_fabric
 from sheeprl.utils.utils import safeatanh, safetanh
 
 
+def script_backbones(module: nn.Module) -> None:
+    """Script with `torch.jit.script` the MLP and CNN backbones of a module, in place.
+    The backbones keep their layers in a `nn.Sequential`, which can be scripted even if
+    the whole module cannot: the parameters are shared with the scripted modules."""
+    for m in list(module.modules()):
+        if isinstance(m, (MLP, CNN)):
+            m._model = torch.jit.script(m._model)
+
+
+def _has_equal_heads(actor_out: Sequence[Tensor]) -> bool:
+    """Whether there are multiple discrete heads with the same number of actions: in that case
+    a single distribution can be built over their stacked logits instead of one per head."""
+    return len(actor_out) > 1 and all(logits.shape[-1] == actor_out[0].shape[-1] for logits in actor_out)
+
+
 class CNNEncoder(nn.Module):
     def __init__(
         self,
@@ -32,7 +47,11 @@ class CNNEncoder(nn.Module):
         self.model = NatureCNN(in_channels=in_channels, features_dim=features_dim, screen_size=screen_size)
 
     def forward(self, obs: Dict[str, Tensor]) -> Tensor:
-        x = torch.cat([obs[k] for k in self.keys], dim=-3)
+        if len(self.keys) == 1:
+            # Avoid the copy done by 'torch.cat' when there is a single key
+            x = obs[self.keys[0]]
+        else:
+            x = torch.cat([obs[k] for k in self.keys], dim=-3)
         return self.model(x)
 
 
@@ -65,7 +84,11 @@ class MLPEncoder(nn.Module):
             )
 
     def forward(self, obs: Dict[str, Tensor]) -> Tensor:
-        x = torch.cat([obs[k] for k in self.keys], dim=-1)
+        if len(self.keys) == 1:
+            # Avoid the copy done by 'torch.cat' when there is a single key
+            x = obs[self.keys[0]]
+        else:
+            x = torch.cat([obs[k] for k in self.keys], dim=-1)
         return self.model(x)
 
 
@@ -76,18 +99,89 @@ class PPOActor(nn.Module):
         actor_heads: torch.nn.ModuleList,
         is_continuous: bool,
         distribution: str = "auto",
+        actions_split: Optional[Sequence[int]] = None,
     ) -> None:
         super().__init__()
         self.actor_backbone = actor_backbone
         self.actor_heads = actor_heads
         self.is_continuous = is_continuous
         self.distribution = distribution
+        # If specified, the first head computes the logits of all the discrete actions at once,
+        # which are then split with these sizes
+        self.actions_split = tuple(int(a) for a in actions_split) if actions_split is not None else None
+        if self.actions_split is not None:
+            self._register_load_state_dict_pre_hook(self._fuse_heads_state_dict)
+
+    def _fuse_heads_state_dict(self, state_dict: Dict[str, Tensor], prefix: str, *args, **kwargs) -> None:
+        # Load the checkpoints saved with one head per discrete action into the fused head:
+        # their optimizer state is remapped by `fuse_heads_optimizer_state`
+        if f"{prefix}actor_heads.1.weight" in state_dict:
+            for name in ("weight", "bias"):
+                state_dict[f"{prefix}actor_heads.0.{name}"] = torch.cat(
+                    [state_dict.pop(f"{prefix}actor_heads.{i}.{name}") for i in range(len(self.actions_split))]
+                )
 
     def forward(self, x: Tensor) -> List[Tensor]:
         x = self.actor_backbone(x)
+        if self.actions_split is not None:
+            return list(self.actor_heads[0](x).split(self.actions_split, dim=-1))
         return [head(x) for head in self.actor_heads]
 
 
+def fuse_heads_optimizer_state(
+    agent: nn.Module, agent_state: Dict[str, Tensor], optimizer_state: Dict[str, Any], prefix: str = "actor."
+) -> Dict[str, Any]:
+    """Remap the optimizer state of a checkpoint saved with one head per discrete action
+    to the parameters of the fused head of the :class:`PPOActor`.
+
+    Args:
+        agent (nn.Module): the agent the checkpoint is loaded into, used to tell apart
+            the parameters and the buffers of the agent state.
+        agent_state (Dict[str, Tensor]): the state of the agent saved in the checkpoint,
+            whose parameters are in the same order as the ones of the optimizer.
+        optimizer_state (Dict[str, Any]): the state of the optimizer saved in the checkpoint.
+        prefix (str, optional): the prefix of the actor parameters in the agent state.
+            Default to "actor.".
+
+    Returns:
+        The optimizer state that can be loaded into an optimizer of the fused agent:
+        the input one if the checkpoint already has a single head.
+    """
+    if f"{prefix}actor_heads.1.weight" not in agent_state:
+        return optimizer_state
+    # The actor heads have no buffers, so the buffers of the checkpoint are the same as the ones of the agent
+    buffer_names = {k for k, v in agent.state_dict(keep_vars=True).items() if not isinstance(v, nn.Parameter)}
+    param_names = [name for name in agent_state if name not in buffer_names]
+    param_ids = [p for group in optimizer_state["param_groups"] for p in group["params"]]
+    if len(param_ids) != len(param_names):
+        raise ValueError(
+            "The optimizer state of the checkpoint does not match the parameters of the agent: "
+            f"found {len(param_ids)} optimized parameters and {len(param_names)} parameters in the agent state"
+        )
+    name_to_id = dict(zip(param_names, param_ids))
+    num_heads = sum(1 for name in param_names if name.startswith(f"{prefix}actor_heads.") and name.endswith(".weight"))
+    state = dict(optimizer_state["state"])
+    removed_ids = set()
+    for name in ("weight", "bias"):
+        head_ids = [name_to_id[f"{prefix}actor_heads.{i}.{name}"] for i in range(num_heads)]
+        head_states = [state.pop(i, None) for i in head_ids]
+        # The state of a parameter is missing if the optimizer has never updated it
+        if all(s is not None for s in head_states):
+            state[head_ids[0]] = {
+                k: torch.cat([s[k] for s in head_states]) if isinstance(v, Tensor) and v.dim() > 0 else v
+                for k, v in head_states[0].items()
+            }
+        removed_ids.update(head_ids[1:])
+    new_ids = {old: new for new, old in enumerate(p for p in param_ids if p not in removed_ids)}
+    return {
+        "state": {new_ids[k]: v for k, v in state.items()},
+        "param_groups": [
+            {**group, "params": [new_ids[p] for p in group["params"] if p not in removed_ids]}
+            for group in optimizer_state["param_groups"]
+        ],
+    }
+
+
 class PPOAgent(nn.Module):
     def __init__(
         self,
@@ -177,11 +271,16 @@ class PPOAgent(nn.Module):
             if actor_cfg.mlp_layers > 0
             else nn.Identity()
         )
+        actions_split = None
         if is_continuous:
             actor_heads = nn.ModuleList([nn.Linear(actor_cfg.dense_units, sum(actions_dim) * 2)])
+        elif len(actions_dim) > 1:
+            # Compute the logits of all the discrete actions with a single matmul
+            actor_heads = nn.ModuleList([nn.Linear(actor_cfg.dense_units, sum(actions_dim))])
+            actions_split = actions_dim
         else:
             actor_heads = nn.ModuleList([nn.Linear(actor_cfg.dense_units, action_dim) for action_dim in actions_dim])
-        self.actor = PPOActor(actor_backbone, actor_heads, is_continuous, self.distribution)
+        self.actor = PPOActor(actor_backbone, actor_heads, is_continuous, self.distribution, actions_split)
 
     def _normal(self, actor_out: Tensor, actions: Optional[List[Tensor]] = None) -> Tuple[Tensor, Tensor, Tensor]:
         mean, log_std = torch.chunk(actor_out, chunks=2, dim=-1)
@@ -217,6 +316,19 @@ class PPOAgent(nn.Module):
             elif self.distribution == "tanh_normal":
                 actions, log_prob, entropy = self._tanh_normal(actor_out[0], actions)
             return tuple([actions]), log_prob, entropy, values
+        elif _has_equal_heads(actor_out):
+            # Build a single distribution over the stacked logits of shape [..., num_heads, action_dim]
+            actions_dist = OneHotCategorical(logits=torch.stack(actor_out, dim=-2))
+            if actions is None:
+                stacked_actions = actions_dist.sample()
+            else:
+                stacked_actions = torch.stack(actions, dim=-2)
+            return (
+                tuple(stacked_actions.unbind(dim=-2)),
+                actions_dist.log_prob(stacked_actions).sum(dim=-1, keepdim=True),
+                actions_dist.entropy().sum(dim=-1, keepdim=True),
+                values,
+            )
         else:
             should_append = False
             actions_logprobs: List[Tensor] = []
@@ -278,6 +390,14 @@ class PPOPlayer(nn.Module):
             elif self.actor.distribution == "tanh_normal":
                 actions, log_prob = self._tanh_normal(actor_out[0])
             return tuple([actions]), log_prob, values
+        elif _has_equal_heads(actor_out):
+            actions_dist = OneHotCategorical(logits=torch.stack(actor_out, dim=-2))
+            stacked_actions = actions_dist.sample()
+            return (
+                tuple(stacked_actions.unbind(dim=-2)),
+                actions_dist.log_prob(stacked_actions).sum(dim=-1, keepdim=True),
+                values,
+            )
         else:
             actions_dist: List[Distribution] = []
             actions_logprobs: List[Tensor] = []
@@ -310,6 +430,10 @@ class PPOPlayer(nn.Module):
             if self.actor.distribution == "tanh_normal":
                 actions = safeatanh(actions, eps=torch.finfo(actions.dtype).resolution)
             return tuple([actions])
+        elif _has_equal_heads(actor_out):
+            actions_dist = OneHotCategorical(logits=torch.stack(actor_out, dim=-2))
+            stacked_actions = actions_dist.mode if greedy else actions_dist.sample()
+            return tuple(stacked_actions.unbind(dim=-2))
         else:
             actions: List[Tensor] = []
             actions_dist: List[Distribution] = []
@@ -353,11 +477,23 @@ def build_agent(
     agent.critic = fabric.setup_module(agent.critic)
     agent.actor = fabric.setup_module(agent.actor)
 
+    # Compile the player networks before they are set up by Fabric, so that the precision context
+    # entered by the Fabric modules stays outside of the compiled region.
+    # The distributions are built outside of the compiled modules
+    if cfg.algo.get("compile_model", False):
+        compile_mode = cfg.algo.get("compile_mode", "default")
+        player.feature_extractor = torch.compile(player.feature_extractor, mode=compile_mode)
+        player.critic = torch.compile(player.critic, mode=compile_mode)
+        player.actor = torch.compile(player.actor, mode=compile_mode)
+
     # Setup player agent
     fabric_player = get_single_device_fabric(fabric)
     player.feature_extractor = fabric_player.setup_module(player.feature_extractor)
     player.critic = fabric_player.setup_module(player.critic)
     player.actor = fabric_player.setup_module(player.actor)
+    if cfg.algo.get("jit_player", False):
+        for module in (player.feature_extractor, player.critic, player.actor):
+            script_backbones(module)
 
     # Tie weights between the agent and the player
     for agent_p, player_p in zip(agent.feature_extractor.parameters(), player.feature_extractor.parameters()):
@@ -15,7 +15,7 @@ from torch import nn
 from torch.utils.data import BatchSampler, DistributedSampler, RandomSampler
 from torchmetrics import SumMetric
 
-from sheeprl.algos.ppo.agent import build_agent
+from sheeprl.algos.ppo.agent import build_agent, fuse_heads_optimizer_state
 from sheeprl.algos.ppo.loss import entropy_loss, policy_loss, value_loss
 from sheeprl.algos.ppo.utils import normalize_obs, prepare_obs, test
 from sheeprl.data.buffers import ReplayBuffer
@@ -188,7 +188,7 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
 
     # Load the state from the checkpoint
     if cfg.checkpoint.resume_from:
-        optimizer.load_state_dict(state["optimizer"])
+        optimizer.load_state_dict(fuse_heads_optimizer_state(agent, state["agent"], state["optimizer"]))
 
     # Setup agent and optimizer with Fabric
     optimizer = fabric.setup_optimizers(optimizer)
@@ -341,7 +341,9 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                             fabric.print(f"Rank-0: policy_step={policy_step}, reward_env_{i}={ep_rew[-1]}")
 
         # Transform the data into PyTorch Tensors
-        local_data = rb.to_tensor(dtype=None, device=device, from_numpy=cfg.buffer.from_numpy)
+        local_data = rb.to_tensor(
+            dtype=None, device=device, from_numpy=cfg.buffer.from_numpy, pin_memory=cfg.buffer.pin_memory
+        )
 
         # Estimate returns with GAE (https://arxiv.org/abs/1506.02438)
         with torch.inference_mode():
@@ -364,10 +366,13 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
             # Gather all the tensors from all the world and reshape them
             gathered_data: Dict[str, torch.Tensor] = fabric.all_gather(local_data)
             # Flatten the first three dimensions: [World_Size, Buffer_Size, Num_Envs]
-            gathered_data = {k: v.flatten(start_dim=0, end_dim=2).float() for k, v in gathered_data.items()}
+            gathered_data = {k: v.flatten(start_dim=0, end_dim=2) for k, v in gathered_data.items()}
         else:
             # Flatten the first two dimensions: [Buffer_Size, Num_Envs]
-            gathered_data = {k: v.flatten(start_dim=0, end_dim=1).float() for k, v in local_data.items()}
+            gathered_data = {k: v.flatten(start_dim=0, end_dim=1) for k, v in local_data.items()}
+        # The images are kept as uint8, 4x smaller than float32:
+        # they are cast to float only when a minibatch is normalized
+        gathered_data = {k: v if k in cfg.algo.cnn_keys.encoder else v.float() for k, v in gathered_data.items()}
 
         with timer("Time/train_time", SumMetric, sync_on_compute=cfg.metric.sync_on_compute):
             train(fabric, agent, optimizer, gathered_data, aggregator, cfg)
@@ -16,7 +16,7 @@ from torch.distributed.algorithms.join import Join
 from torch.utils.data import BatchSampler, RandomSampler
 from torchmetrics import SumMetric
 
-from sheeprl.algos.ppo.agent import build_agent
+from sheeprl.algos.ppo.agent import build_agent, fuse_heads_optimizer_state
 from sheeprl.algos.ppo.loss import entropy_loss, policy_loss, value_loss
 from sheeprl.algos.ppo.utils import normalize_obs, prepare_obs, test
 from sheeprl.data.buffers import ReplayBuffer
@@ -269,7 +269,9 @@ def player(
                         fabric.print(f"Rank-0: policy_step={policy_step}, reward_env_{i}={ep_rew[-1]}")
 
         # Transform the data into PyTorch Tensors
-        local_data = rb.to_tensor(dtype=None, device=device, from_numpy=cfg.buffer.from_numpy)
+        local_data = rb.to_tensor(
+            dtype=None, device=device, from_numpy=cfg.buffer.from_numpy, pin_memory=cfg.buffer.pin_memory
+        )
 
         # Estimate returns with GAE (https://arxiv.org/abs/1506.02438)
         torch_obs = prepare_obs(fabric, obs, cnn_keys=cfg.algo.cnn_keys.encoder, num_envs=cfg.env.num_envs)
@@ -411,7 +413,7 @@ def trainer(
     # Load the state from the checkpoint
     if cfg.checkpoint.resume_from:
         agent.load_state_dict(state["agent"])
-        optimizer.load_state_dict(state["optimizer"])
+        optimizer.load_state_dict(fuse_heads_optimizer_state(agent, state["agent"], state["optimizer"]))
 
     # Setup agent and optimizer with Fabric
     optimizer = fabric.setup_optimizers(optimizer)
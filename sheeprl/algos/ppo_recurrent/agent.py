@@ -10,7 +10,7 @@ from lightning import Fabric
 from torch import Tensor
 from torch.distributions import Independent, Normal, OneHotCategorical
 
-from sheeprl.algos.ppo.agent import CNNEncoder, MLPEncoder, PPOActor
+from sheeprl.algos.ppo.agent import CNNEncoder, MLPEncoder, PPOActor, script_backbones
 from sheeprl.models.models import MLP, MultiEncoder
 from sheeprl.utils.fabric import get_single_device_fabric
 
@@ -68,13 +68,17 @@ class RecurrentModel(nn.Module):
         self, input: Tensor, states: Tuple[Tensor, Tensor], mask: Optional[Tensor] = None
     ) -> Tuple[Tensor, Tuple[Tensor, Tensor]]:
         x = self._pre_mlp(input)
-        self._lstm.flatten_parameters()
+        packed = False
         if mask is not None:
             # To avoid: RuntimeError: 'lengths' argument should be a 1D CPU int64 tensor, but got 1D cuda:0 Long tensor
             lengths = mask.sum(dim=0).view(-1).cpu()
-            x = torch.nn.utils.rnn.pack_padded_sequence(x, lengths=lengths, batch_first=False, enforce_sorted=False)
+            # Pack the sequences only if some of them are padded: if every sequence spans the whole
+            # time dimension, then the LSTM can process the full batch with a single fused call
+            if (lengths < mask.shape[0]).any():
+                x = torch.nn.utils.rnn.pack_padded_sequence(x, lengths=lengths, batch_first=False, enforce_sorted=False)
+                packed = True
         out, states = self._lstm(x, states)
-        if mask is not None:
+        if packed:
             out, _ = torch.nn.utils.rnn.pad_packed_sequence(out, batch_first=False, total_length=mask.shape[0])
         shape = out.shape
         return self._post_mlp(out.view(-1, *shape[2:])).view(shape), states
@@ -165,11 +169,16 @@ class RecurrentPPOAgent(nn.Module):
                 else None
             ),
         )
+        actions_split = None
         if is_continuous:
             actor_heads = nn.ModuleList([nn.Linear(actor_cfg.dense_units, int(sum(actions_dim)) * 2)])
+        elif len(actions_dim) > 1:
+            # Compute the logits of all the discrete actions with a single matmul
+            actor_heads = nn.ModuleList([nn.Linear(actor_cfg.dense_units, int(sum(actions_dim)))])
+            actions_split = actions_dim
         else:
             actor_heads = nn.ModuleList([nn.Linear(actor_cfg.dense_units, action_dim) for action_dim in actions_dim])
-        self.actor = PPOActor(actor_backbone, actor_heads, is_continuous)
+        self.actor = PPOActor(actor_backbone, actor_heads, is_continuous, actions_split=actions_split)
 
         # Initial recurrent states for both the actor and critic rnn
         self._initial_states: Tensor = self.reset_hidden_states()
@@ -451,12 +460,32 @@ def build_agent(
     agent.critic = fabric.setup_module(agent.critic)
     agent.actor = fabric.setup_module(agent.actor)
 
+    # Flatten the LSTM weights into a contiguous chunk of memory once, instead of at every forward.
+    # This must happen before tying the weights, since on cuDNN flattening re-allocates them:
+    # the player LSTM then points to the same chunk
+    for module in agent.rnn.modules():
+        if isinstance(module, nn.LSTM):
+            module.flatten_parameters()
+
+    # Compile the player networks, except for the recurrent model that deals with packed sequences.
+    # They are compiled before being set up by Fabric, so that the precision context entered by
+    # the Fabric modules stays outside of the compiled region.
+    # The distributions are built outside of the compiled modules
+    if cfg.algo.get("compile_model", False):
+        compile_mode = cfg.algo.get("compile_mode", "default")
+        player.feature_extractor = torch.compile(player.feature_extractor, mode=compile_mode)
+        player.critic = torch.compile(player.critic, mode=compile_mode)
+        player.actor = torch.compile(player.actor, mode=compile_mode)
+
     # Setup player agent
     fabric_player = get_single_device_fabric(fabric)
     player.feature_extractor = fabric_player.setup_module(player.feature_extractor)
     player.rnn = fabric_player.setup_module(player.rnn)
     player.critic = fabric_player.setup_module(player.critic)
     player.actor = fabric_player.setup_module(player.actor)
+    if cfg.algo.get("jit_player", False):
+        for module in (player.feature_extractor, player.critic, player.actor):
+            script_backbones(module)
 
     # Tie weights between the agent and the player
     for agent_p, player_p in zip(agent.feature_extractor.parameters(), player.feature_extractor.parameters()):
@@ -16,6 +16,7 @@ from torch.distributed.algorithms.join import Join
 from torch.utils.data.sampler import BatchSampler, RandomSampler
 from torchmetrics import SumMetric
 
+from sheeprl.algos.ppo.agent import fuse_heads_optimizer_state
 from sheeprl.algos.ppo.loss import entropy_loss, policy_loss, value_loss
 from sheeprl.algos.ppo_recurrent.agent import RecurrentPPOAgent, build_agent
 from sheeprl.algos.ppo_recurrent.utils import prepare_obs, test
@@ -74,14 +75,17 @@ def train(
                     mask=mask,
                 )
 
-                normalized_advantages = batch["advantages"][mask]
+                # Compute the indices of the non-padded steps only once: indexing with a boolean mask
+                # computes them at every call, each time synchronizing with the device
+                valid_idxes = mask.nonzero(as_tuple=True)
+                normalized_advantages = batch["advantages"][valid_idxes]
                 if cfg.algo.normalize_advantages and len(normalized_advantages) > 1:
                     normalized_advantages = normalize_tensor(normalized_advantages)
 
                 # Policy loss
                 pg_loss = policy_loss(
-                    logprobs[mask],
-                    batch["logprobs"][mask],
+                    logprobs[valid_idxes],
+                    batch["logprobs"][valid_idxes],
                     normalized_advantages,
                     cfg.algo.clip_coef,
                     "mean",
@@ -89,16 +93,16 @@ def train(
 
                 # Value loss
                 v_loss = value_loss(
-                    values[mask],
-                    batch["values"][mask],
-                    batch["returns"][mask],
+                    values[valid_idxes],
+                    batch["values"][valid_idxes],
+                    batch["returns"][valid_idxes],
                     cfg.algo.clip_coef,
                     cfg.algo.clip_vloss,
                     "mean",
                 )
 
                 # Entropy loss
-                ent_loss = entropy_loss(entropies[mask], cfg.algo.loss_reduction)
+                ent_loss = entropy_loss(entropies[valid_idxes], cfg.algo.loss_reduction)
 
                 # Equation (9) in the paper
                 loss = pg_loss + cfg.algo.vf_coef * v_loss + cfg.algo.ent_coef * ent_loss
@@ -202,7 +206,7 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
 
     # Load the state from the checkpoint
     if cfg.checkpoint.resume_from:
-        optimizer.load_state_dict(state["optimizer"])
+        optimizer.load_state_dict(fuse_heads_optimizer_state(agent, state["agent"], state["optimizer"]))
     # Setup agent and optimizer with Fabric
     optimizer = fabric.setup_optimizers(optimizer)
 
@@ -353,7 +357,8 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                 rb.add(step_data, validate_args=cfg.buffer.validate_args)
 
                 # Update actions
-                prev_actions = (1 - dones) * actions
+                not_dones = 1 - dones
+                prev_actions = not_dones * actions
                 torch_prev_actions = torch.from_numpy(prev_actions).to(device).float()
 
                 # Update the observation
@@ -364,9 +369,11 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                         obs[k] = obs[k].reshape(1, cfg.env.num_envs, -1, *obs[k].shape[-2:])
                     step_data[k] = obs[k]
 
-                # Reset the states if the episode is done
-                if cfg.algo.reset_recurrent_state_on_done:
-                    prev_states = tuple([(1 - torch.as_tensor(dones, device=device)) * s for s in states])
+                # Reset the states if the episode is done: the mask is checked on CPU and
+                # moved to the device only once for both the states
+                if cfg.algo.reset_recurrent_state_on_done and dones.any():
+                    torch_not_dones = torch.from_numpy(not_dones).to(device)
+                    prev_states = tuple(torch_not_dones * s for s in states)
                 else:
                     prev_states = states
 
@@ -381,7 +388,9 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                             fabric.print(f"Rank-0: policy_step={policy_step}, reward_env_{i}={ep_rew[-1]}")
 
         # Transform the data into PyTorch Tensors
-        local_data = rb.to_tensor(dtype=None, device=device, from_numpy=cfg.buffer.from_numpy)
+        local_data = rb.to_tensor(
+            dtype=None, device=device, from_numpy=cfg.buffer.from_numpy, pin_memory=cfg.buffer.pin_memory
+        )
 
         # Estimate returns with GAE (https://arxiv.org/abs/1506.02438)
         with torch.inference_mode():
@@ -40,36 +40,40 @@ def prepare_obs(
 
 @torch.no_grad()
 def test(agent: "RecurrentPPOPlayer", fabric: Fabric, cfg: Dict[str, Any], log_dir: str):
-    env = make_env(cfg, None, 0, log_dir, "test", vector_env_idx=0)()
+    # The test environments are stepped together, so that the greedy actions are computed in a single batch
+    num_envs = cfg.algo.get("num_test_envs", 1)
+    env = gym.vector.SyncVectorEnv([make_env(cfg, None, 0, log_dir, "test", vector_env_idx=i) for i in range(num_envs)])
     agent.eval()
-    done = False
-    cumulative_rew = 0
-    agent.num_envs = 1
+    done = np.zeros(num_envs, dtype=np.bool_)
+    cumulative_rew = np.zeros(num_envs)
+    agent.num_envs = num_envs
     obs = env.reset(seed=cfg.seed)[0]
     with fabric.device:
         state = (
-            torch.zeros(1, 1, agent.rnn_hidden_size, device=fabric.device),
-            torch.zeros(1, 1, agent.rnn_hidden_size, device=fabric.device),
+            torch.zeros(1, num_envs, agent.rnn_hidden_size, device=fabric.device),
+            torch.zeros(1, num_envs, agent.rnn_hidden_size, device=fabric.device),
         )
-        actions = torch.zeros(1, 1, sum(agent.actions_dim), device=fabric.device)
-    while not done:
-        torch_obs = prepare_obs(fabric, obs, cnn_keys=cfg.algo.cnn_keys.encoder)
-        # Act greedly through the environment
+        actions = torch.zeros(1, num_envs, sum(agent.actions_dim), device=fabric.device)
+    while not done.all():
+        torch_obs = prepare_obs(fabric, obs, cnn_keys=cfg.algo.cnn_keys.encoder, num_envs=num_envs)
+        # Act greedly through the environments
         actions, state = agent.get_actions(torch_obs, actions, state, greedy=True)
         if agent.actor.is_continuous:
             real_actions = torch.stack(actions, -1)
-            actions = torch.cat(actions, dim=-1).view(1, 1, -1)
+            actions = torch.cat(actions, dim=-1).view(1, num_envs, -1)
         else:
             real_actions = torch.stack([act.argmax(dim=-1) for act in actions], dim=-1)
-            actions = torch.cat([act for act in actions], dim=-1).view(1, 1, -1)
+            actions = torch.cat([act for act in actions], dim=-1).view(1, num_envs, -1)
 
-        # Single environment step
-        obs, reward, done, truncated, info = env.step(real_actions.cpu().numpy().reshape(env.action_space.shape))
-        done = done or truncated
-        cumulative_rew += reward
+        # Step all the environments: the ones that are already done are automatically reset
+        # by the vectorized environment, so their rewards are not accumulated anymore
+        obs, reward, terminated, truncated, info = env.step(real_actions.cpu().numpy().reshape(env.action_space.shape))
+        cumulative_rew += reward * ~done
+        done |= np.logical_or(terminated, truncated)
 
         if cfg.dry_run:
-            done = True
+            done[:] = True
+    cumulative_rew = cumulative_rew.mean()
     fabric.print("Test - Reward:", cumulative_rew)
     if cfg.metric.log_level > 0:
         fabric.log_dict({"Test/cumulative_reward": cumulative_rew}, 0)
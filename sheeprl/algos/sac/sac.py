@@ -310,6 +310,7 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                     dtype=None,
                     device=device,
                     from_numpy=cfg.buffer.from_numpy,
+                    pin_memory=cfg.buffer.pin_memory,
                 )  # [G*B]
                 gathered_data: Dict[str, torch.Tensor] = fabric.all_gather(sample)  # [World, G*B]
                 for k, v in gathered_data.items():
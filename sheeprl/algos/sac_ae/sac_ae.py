@@ -383,6 +383,7 @@ def main(fabric: Fabric, cfg: Dict[str, Any]):
                     per_rank_gradient_steps * cfg.algo.per_rank_batch_size,
                     sample_next_obs=cfg.buffer.sample_next_obs,
                     from_numpy=cfg.buffer.from_numpy,
+                    pin_memory=cfg.buffer.pin_memory,
                 )  # [1, G*B]
                 gathered_data: Dict[str, torch.Tensor] = fabric.all_gather(sample)  # [World, 1, G*B]
                 for k, v in gathered_data.items():
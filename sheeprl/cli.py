@@ -3,7 +3,7 @@ import os
 import pathlib
 import warnings
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 import hydra
 import torch
@@ -19,11 +19,52 @@ from sheeprl.utils.registry import algorithm_registry, evaluation_registry
 from sheeprl.utils.timer import timer
 from sheeprl.utils.utils import dotdict, print_config
 
+# Names of the registered DDP-like strategies, supported by the decoupled algorithms
+_DDP_STRATEGIES = frozenset(s for s in STRATEGY_REGISTRY.available_strategies() if "ddp" in s)
+
+
+def _build_algorithm_index() -> Dict[str, Tuple[str, str, bool]]:
+    # Built from the registry at every call, so that algorithms registered or replaced later are picked up
+    return {
+        _algo["name"]: (_module, _algo["entrypoint"], _algo["decoupled"])
+        for _module, _algos in algorithm_registry.items()
+        for _algo in _algos
+    }
+
+
+def _get_algorithm(algo_name: str) -> Tuple[str, str, bool]:
+    """Retrieve the module, the entrypoint and whether the algorithm is decoupled
+    given the name of a registered algorithm.
+
+    Args:
+        algo_name (str): the name of the algorithm.
+
+    Returns:
+        the module, the entrypoint and the decoupled flag of the algorithm.
+    """
+    index = _build_algorithm_index()
+    try:
+        return index[algo_name]
+    except KeyError:
+        raise RuntimeError(f"Given the algorithm named '{algo_name}', no module has been found to be imported.")
+
+
+def _load_checkpoint_config(ckpt_path: str) -> dotdict:
+    """Load the configuration of the experiment that saved the checkpoint,
+    resolved and converted to a `dotdict` in a single pass.
+
+    Args:
+        ckpt_path (str): the path to the checkpoint.
+
+    Returns:
+        the configuration of the experiment.
+    """
+    ckpt_cfg = OmegaConf.load(pathlib.Path(ckpt_path).parent.parent / "config.yaml")
+    return dotdict(OmegaConf.to_container(ckpt_cfg, resolve=True, throw_on_missing=True))
+
 
 def resume_from_checkpoint(cfg: DictConfig) -> DictConfig:
-    ckpt_path = pathlib.Path(cfg.checkpoint.resume_from)
-    old_cfg = OmegaConf.load(ckpt_path.parent.parent / "config.yaml")
-    old_cfg = dotdict(OmegaConf.to_container(old_cfg, resolve=True, throw_on_missing=True))
+    old_cfg = _load_checkpoint_config(cfg.checkpoint.resume_from)
     if old_cfg.env.id != cfg.env.id:
         raise ValueError(
             "This experiment is run with a different environment from the one of the experiment you want to restart. "
@@ -75,19 +116,8 @@ def run_algorithm(cfg: Dict[str, Any]):
     # 'cfg.algo.name'.py is contained; from there retrieve the
     # 'register_algorithm'-decorated entrypoint;
     # the entrypoint will be launched by Fabric with 'fabric.launch(entrypoint)'
-    module = None
-    decoupled = False
-    entrypoint = None
     algo_name = cfg.algo.name
-    for _module, _algos in algorithm_registry.items():
-        for _algo in _algos:
-            if algo_name == _algo["name"]:
-                module = _module
-                entrypoint = _algo["entrypoint"]
-                decoupled = _algo["decoupled"]
-                break
-    if module is None:
-        raise RuntimeError(f"Given the algorithm named '{algo_name}', no module has been found to be imported.")
+    module, entrypoint, decoupled = _get_algorithm(algo_name)
     if entrypoint is None:
         raise RuntimeError(
             f"Given the module and algorithm named '{module}' and '{algo_name}' respectively, "
@@ -116,9 +146,7 @@ def run_algorithm(cfg: Dict[str, Any]):
             strategy = DDPStrategy(find_unused_parameters=True)
         elif "finetuning" in algo_name and "p2e" in module:
             # Load exploration configurations
-            ckpt_path = pathlib.Path(cfg.checkpoint.exploration_ckpt_path)
-            exploration_cfg = OmegaConf.load(ckpt_path.parent.parent / "config.yaml")
-            exploration_cfg = dotdict(OmegaConf.to_container(exploration_cfg, resolve=True, throw_on_missing=True))
+            exploration_cfg = _load_checkpoint_config(cfg.checkpoint.exploration_ckpt_path)
             if exploration_cfg.env.id != cfg.env.id:
                 raise ValueError(
                     "This experiment is run with a different environment from "
@@ -279,19 +307,12 @@ def check_configs(cfg: Dict[str, Any]):
             f"Invalid value '{cfg.float32_matmul_precision}' for the 'float32_matmul_precision' parameter. "
             "It must be one of 'medium', 'high' or 'highest'."
         )
-    decoupled = False
-    algo_name = cfg.algo.name
-    for _, _algos in algorithm_registry.items():
-        for _algo in _algos:
-            if algo_name == _algo["name"]:
-                decoupled = _algo["decoupled"]
-                break
+    decoupled = _get_algorithm(cfg.algo.name)[2]
     strategy = cfg.fabric.strategy
-    available_strategies = STRATEGY_REGISTRY.available_strategies()
     if decoupled:
         if isinstance(strategy, str):
             strategy = strategy.lower()
-            if not (strategy in available_strategies and "ddp" in strategy):
+            if strategy not in _DDP_STRATEGIES:
                 raise ValueError(
                     f"{strategy} is currently not supported for decoupled algorithm. "
                     "Please launch the script with a DDP strategy: "
@@ -309,7 +330,7 @@ def check_configs(cfg: Dict[str, Any]):
     else:
         if isinstance(strategy, str):
             strategy = strategy.lower()
-            if strategy != "auto" and not (strategy in available_strategies and "ddp" in strategy):
+            if strategy != "auto" and strategy not in _DDP_STRATEGIES:
                 warnings.warn(
                     f"Running an algorithm with a strategy ({strategy}) "
                     "different than 'auto' or 'dpp' can cause unexpected problems. "
@@ -363,6 +384,8 @@ def run(cfg: DictConfig):
         cfg = resume_from_checkpoint(cfg)
     cfg = dotdict(OmegaConf.to_container(cfg, resolve=True, throw_on_missing=True))
     check_configs(cfg)
+    if cfg.get("validate_only", False):
+        return
     run_algorithm(cfg)
 
 
@@ -112,6 +112,7 @@ class ReplayBuffer:
         clone: bool = False,
         device: str | torch.dtype = "cpu",
         from_numpy: bool = False,
+        pin_memory: bool = False,
     ) -> Dict[str, Tensor]:
         """Converts the replay buffer to a dictionary mapping string to torch.Tensor.
 
@@ -125,13 +126,18 @@ class ReplayBuffer:
                 Defaults to "cpu".
             from_numpy (bool, optional): whether to convert the numpy arrays to torch tensors
                 with the 'torch.from_numpy' function. Defaults to False.
+            pin_memory (bool, optional): whether to pin the converted tensors in page-locked memory
+                and copy them asynchronously to the device. It has effect only on CUDA devices.
+                Defaults to False.
 
         Returns:
             Dict[str, Tensor]: the converted buffer.
         """
         buf = {}
         for k, v in self.buffer.items():
-            buf[k] = get_tensor(v, dtype=dtype, clone=clone, device=device, from_numpy=from_numpy)
+            buf[k] = get_tensor(
+                v, dtype=dtype, clone=clone, device=device, from_numpy=from_numpy, pin_memory=pin_memory
+            )
         return buf
 
     @typing.overload
@@ -192,14 +198,19 @@ class ReplayBuffer:
                     last_batch_shape = current_batch_shape
         data_len = next(iter(data.values())).shape[0]
         next_pos = (self._pos + data_len) % self._buffer_size
-        if next_pos <= self._pos or (data_len > self._buffer_size and not self._full):
-            idxes = np.array(list(range(self._pos, self._buffer_size)) + list(range(0, next_pos)))
-        else:
-            idxes = np.array(range(self._pos, next_pos))
         if data_len > self._buffer_size:
-            data_to_store = {k: v[-self._buffer_size - next_pos :] for k, v in data.items()}
+            # Only the last 'buffer_size' elements would survive the insertion
+            data_to_store = {k: v[-self._buffer_size :] for k, v in data.items()}
+            store_len = self._buffer_size
         else:
             data_to_store = data
+            store_len = data_len
+        start = (self._pos + data_len - store_len) % self._buffer_size
+        if start + store_len <= self._buffer_size:
+            # No wrap-around: write a contiguous slice, without building the index array
+            idxes = slice(start, start + store_len)
+        else:
+            idxes = np.arange(start, start + store_len) % self._buffer_size
         if self._memmap and self.empty:
             for k, v in data_to_store.items():
                 self.buffer[k] = MemmapArray(
@@ -248,8 +259,8 @@ class ReplayBuffer:
         if self._full:
             first_range_end = self._pos - 1 if sample_next_obs else self._pos
             second_range_end = self.buffer_size if first_range_end >= 0 else self.buffer_size + first_range_end
-            valid_idxes = np.array(
-                list(range(0, first_range_end)) + list(range(self._pos, second_range_end)), dtype=np.intp
+            valid_idxes = np.concatenate(
+                (np.arange(0, first_range_end, dtype=np.intp), np.arange(self._pos, second_range_end, dtype=np.intp))
             )
             batch_idxes = valid_idxes[
                 self._rng.integers(0, len(valid_idxes), size=(batch_size * n_samples,), dtype=np.intp)
@@ -278,13 +289,12 @@ class ReplayBuffer:
         if sample_next_obs:
             flattened_next_idxes = (((batch_idxes + 1) % self._buffer_size) * self.n_envs + env_idxes).flat
         for k, v in self.buffer.items():
-            samples[k] = np.take(np.reshape(v, (-1, *v.shape[2:])), flattened_idxes, axis=0)
-            if clone:
-                samples[k] = samples[k].copy()
+            # 'np.take' always returns a new array, so there is no need to copy the samples
+            # even if 'clone' is True
+            flattened_v = np.reshape(v, (-1, *v.shape[2:]))
+            samples[k] = np.take(flattened_v, flattened_idxes, axis=0)
             if k in self._obs_keys and sample_next_obs:
-                samples[f"next_{k}"] = np.take(np.reshape(v, (-1, *v.shape[2:])), flattened_next_idxes, axis=0)
-                if clone:
-                    samples[f"next_{k}"] = samples[f"next_{k}"].copy()
+                samples[f"next_{k}"] = np.take(flattened_v, flattened_next_idxes, axis=0)
         return samples
 
     @torch.no_grad()
@@ -296,6 +306,7 @@ class ReplayBuffer:
         dtype: Optional[torch.dtype] = None,
         device: str | torch.dtype = "cpu",
         from_numpy: bool = False,
+        pin_memory: bool = False,
         **kwargs,
     ) -> Dict[str, Tensor]:
         """Sample elements from the replay buffer and convert them to torch tensors.
@@ -311,6 +322,9 @@ class ReplayBuffer:
             from_numpy (bool, optional): whether to convert the numpy arrays to torch tensors
                 with the 'torch.from_numpy' function. If False, then the numpy arrays are converted
                 with the 'torch.as_tensor' function. Defaults to False.
+            pin_memory (bool, optional): whether to pin the sampled tensors in page-locked memory
+                and copy them asynchronously to the device. It has effect only on CUDA devices.
+                Defaults to False.
             kwargs: additional keyword arguments to be passed to the 'self.sample' method.
 
         Returns:
@@ -322,7 +336,8 @@ class ReplayBuffer:
             batch_size=batch_size, sample_next_obs=sample_next_obs, clone=clone, n_samples=n_samples, **kwargs
         )
         return {
-            k: get_tensor(v, dtype=dtype, clone=clone, device=device, from_numpy=from_numpy) for k, v in samples.items()
+            k: get_tensor(v, dtype=dtype, clone=clone, device=device, from_numpy=from_numpy, pin_memory=pin_memory)
+            for k, v in samples.items()
         }
 
     def __getitem__(self, key: str) -> np.ndarray | np.memmap | MemmapArray:
@@ -708,6 +723,7 @@ class EnvIndependentReplayBuffer:
         dtype: Optional[torch.dtype] = None,
         device: str | torch.dtype = "cpu",
         from_numpy: bool = False,
+        pin_memory: bool = False,
         **kwargs,
     ) -> Dict[str, Tensor]:
         """Sample elements from the replay buffer and convert them to torch tensors.
@@ -724,6 +740,9 @@ class EnvIndependentReplayBuffer:
             from_numpy (bool, optional): whether to convert the numpy arrays to torch tensors
                 with the 'torch.from_numpy' function. If False, then the numpy arrays are converted
                 with the 'torch.as_tensor' function. Defaults to False.
+            pin_memory (bool, optional): whether to pin the sampled tensors in page-locked memory
+                and copy them asynchronously to the device. It has effect only on CUDA devices.
+                Defaults to False.
             kwargs: additional keyword arguments to be passed to the 'self.sample' method.
 
         Returns:
@@ -739,7 +758,8 @@ class EnvIndependentReplayBuffer:
             **kwargs,
         )
         return {
-            k: get_tensor(v, dtype=dtype, clone=clone, device=device, from_numpy=from_numpy) for k, v in samples.items()
+            k: get_tensor(v, dtype=dtype, clone=clone, device=device, from_numpy=from_numpy, pin_memory=pin_memory)
+            for k, v in samples.items()
         }
 
 
@@ -1130,6 +1150,7 @@ class EpisodeBuffer:
         dtype: Optional[torch.dtype] = None,
         device: str | torch.dtype = "cpu",
         from_numpy: bool = False,
+        pin_memory: bool = False,
         **kwargs,
     ) -> Dict[str, Tensor]:
         """Sample elements from the replay buffer and convert them to torch tensors.
@@ -1147,11 +1168,15 @@ class EpisodeBuffer:
             from_numpy (bool, optional): whether to convert the numpy arrays to torch tensors
                 with the 'torch.from_numpy' function. If False, then the numpy arrays are converted
                 with the 'torch.as_tensor' function. Defaults to False.
+            pin_memory (bool, optional): whether to pin the sampled tensors in page-locked memory
+                and copy them asynchronously to the device. It has effect only on CUDA devices.
+                Defaults to False.
             kwargs: additional keyword arguments to be passed to the 'self.sample' method.
         """
         samples = self.sample(batch_size, sample_next_obs, n_samples, clone, sequence_length)
         return {
-            k: get_tensor(v, dtype=dtype, clone=clone, device=device, from_numpy=from_numpy) for k, v in samples.items()
+            k: get_tensor(v, dtype=dtype, clone=clone, device=device, from_numpy=from_numpy, pin_memory=pin_memory)
+            for k, v in samples.items()
         }
 
 
@@ -1161,11 +1186,18 @@ def get_tensor(
     clone: bool = False,
     device: str | torch.dtype = "cpu",
     from_numpy: bool = False,
+    pin_memory: bool = False,
 ) -> Tensor:
     if isinstance(array, MemmapArray):
         array = array.array
     if clone:
         array = array.copy()
+    if pin_memory and torch.device(device).type == "cuda":
+        # Build the tensor on CPU, pin it and issue an asynchronous host-to-device copy:
+        # the kernels that consume the tensor are queued on the same stream, so they will wait for the copy
+        torch_v = torch.from_numpy(array) if from_numpy else torch.as_tensor(array)
+        torch_v = torch_v.to(dtype=NUMPY_TO_TORCH_DTYPE_DICT[array.dtype] if dtype is None else dtype)
+        return torch_v.pin_memory().to(device, non_blocking=True)
     if from_numpy:
         torch_v = torch.from_numpy(array).to(
             dtype=NUMPY_TO_TORCH_DTYPE_DICT[array.dtype] if dtype is None else dtype,
@@ -17,27 +17,32 @@ from minedojo.sim import ALL_CRAFT_SMELT_ITEMS, ALL_ITEMS
 from minedojo.sim.wrappers.ar_nn import ARNNWrapper
 
 N_ALL_ITEMS = len(ALL_ITEMS)
-ACTION_MAP = {
-    0: np.array([0, 0, 0, 12, 12, 0, 0, 0]),  # no-op
-    1: np.array([1, 0, 0, 12, 12, 0, 0, 0]),  # forward
-    2: np.array([2, 0, 0, 12, 12, 0, 0, 0]),  # back
-    3: np.array([0, 1, 0, 12, 12, 0, 0, 0]),  # left
-    4: np.array([0, 2, 0, 12, 12, 0, 0, 0]),  # right
-    5: np.array([1, 0, 1, 12, 12, 0, 0, 0]),  # jump + forward
-    6: np.array([1, 0, 2, 12, 12, 0, 0, 0]),  # sneak + forward
-    7: np.array([1, 0, 3, 12, 12, 0, 0, 0]),  # sprint + forward
-    8: np.array([0, 0, 0, 11, 12, 0, 0, 0]),  # pitch down (-15)
-    9: np.array([0, 0, 0, 13, 12, 0, 0, 0]),  # pitch up (+15)
-    10: np.array([0, 0, 0, 12, 11, 0, 0, 0]),  # yaw down (-15)
-    11: np.array([0, 0, 0, 12, 13, 0, 0, 0]),  # yaw up (+15)
-    12: np.array([0, 0, 0, 12, 12, 1, 0, 0]),  # use
-    13: np.array([0, 0, 0, 12, 12, 2, 0, 0]),  # drop
-    14: np.array([0, 0, 0, 12, 12, 3, 0, 0]),  # attack
-    15: np.array([0, 0, 0, 12, 12, 4, 0, 0]),  # craft
-    16: np.array([0, 0, 0, 12, 12, 5, 0, 0]),  # equip
-    17: np.array([0, 0, 0, 12, 12, 6, 0, 0]),  # place
-    18: np.array([0, 0, 0, 12, 12, 7, 0, 0]),  # destroy
-}
+# Each row is the MineDojo action corresponding to one of the discrete actions of the agent
+ACTION_TABLE = np.array(
+    [
+        [0, 0, 0, 12, 12, 0, 0, 0],  # no-op
+        [1, 0, 0, 12, 12, 0, 0, 0],  # forward
+        [2, 0, 0, 12, 12, 0, 0, 0],  # back
+        [0, 1, 0, 12, 12, 0, 0, 0],  # left
+        [0, 2, 0, 12, 12, 0, 0, 0],  # right
+        [1, 0, 1, 12, 12, 0, 0, 0],  # jump + forward
+        [1, 0, 2, 12, 12, 0, 0, 0],  # sneak + forward
+        [1, 0, 3, 12, 12, 0, 0, 0],  # sprint + forward
+        [0, 0, 0, 11, 12, 0, 0, 0],  # pitch down (-15)
+        [0, 0, 0, 13, 12, 0, 0, 0],  # pitch up (+15)
+        [0, 0, 0, 12, 11, 0, 0, 0],  # yaw down (-15)
+        [0, 0, 0, 12, 13, 0, 0, 0],  # yaw up (+15)
+        [0, 0, 0, 12, 12, 1, 0, 0],  # use
+        [0, 0, 0, 12, 12, 2, 0, 0],  # drop
+        [0, 0, 0, 12, 12, 3, 0, 0],  # attack
+        [0, 0, 0, 12, 12, 4, 0, 0],  # craft
+        [0, 0, 0, 12, 12, 5, 0, 0],  # equip
+        [0, 0, 0, 12, 12, 6, 0, 0],  # place
+        [0, 0, 0, 12, 12, 7, 0, 0],  # destroy
+    ]
+)
+# Indices of the agent position in 'MineDojoWrapper._pos'
+_X, _Y, _Z, _PITCH, _YAW = range(5)
 ITEM_ID_TO_NAME = dict(enumerate(ALL_ITEMS))
 ITEM_NAME_TO_ID = dict(zip(ALL_ITEMS, range(N_ALL_ITEMS)))
 ALL_TASKS_SPECS = copy.deepcopy(minedojo.tasks.ALL_TASKS_SPECS)
@@ -68,18 +73,26 @@ class MineDojoWrapper(gym.Wrapper):
         self._height = height
         self._width = width
         self._pitch_limits = pitch_limits
-        self._pos = kwargs.get("start_position", None)
+        self._min_pitch, self._max_pitch = pitch_limits
+        start_position = kwargs.get("start_position", None)
         self._break_speed_multiplier = kwargs.pop("break_speed_multiplier", 100)
-        self._start_pos = copy.deepcopy(self._pos)
+        self._start_pos = copy.deepcopy(start_position)
         self._sticky_attack = 0 if self._break_speed_multiplier > 1 else sticky_attack
         self._sticky_jump = sticky_jump
         self._sticky_attack_counter = 0
         self._sticky_jump_counter = 0
 
-        if self._pos is not None and not (self._pitch_limits[0] <= self._pos["pitch"] <= self._pitch_limits[1]):
+        if start_position is not None and not (
+            self._pitch_limits[0] <= start_position["pitch"] <= self._pitch_limits[1]
+        ):
             raise ValueError(
-                f"The initial position must respect the pitch limits {self._pitch_limits}, given {self._pos['pitch']}"
+                f"The initial position must respect the pitch limits {self._pitch_limits}, "
+                f"given {start_position['pitch']}"
             )
+        # The position of the agent: [x, y, z, pitch, yaw]
+        self._pos = np.zeros(5)
+        if start_position is not None:
+            self._pos[:] = [start_position[k] for k in ("x", "y", "z", "pitch", "yaw")]
 
         env: ARNNWrapper = minedojo.make(
             task_id=id,
@@ -94,7 +107,7 @@ class MineDojoWrapper(gym.Wrapper):
         self._inventory_names = None
         self._inventory_max = np.zeros(N_ALL_ITEMS)
         self.action_space = gym.spaces.MultiDiscrete(
-            np.array([len(ACTION_MAP.keys()), len(ALL_CRAFT_SMELT_ITEMS), N_ALL_ITEMS])
+            np.array([len(ACTION_TABLE), len(ALL_CRAFT_SMELT_ITEMS), N_ALL_ITEMS])
         )
         self.observation_space = gym.spaces.Dict(
             {
@@ -104,7 +117,7 @@ class MineDojoWrapper(gym.Wrapper):
                 "inventory_delta": gym.spaces.Box(-np.inf, np.inf, (N_ALL_ITEMS,), np.float32),
                 "equipment": gym.spaces.Box(0.0, 1.0, (N_ALL_ITEMS,), np.int32),
                 "life_stats": gym.spaces.Box(0.0, np.array([20.0, 20.0, 300.0]), (3,), np.float32),
-                "mask_action_type": gym.spaces.Box(0, 1, (len(ACTION_MAP),), bool),
+                "mask_action_type": gym.spaces.Box(0, 1, (len(ACTION_TABLE),), bool),
                 "mask_equip_place": gym.spaces.Box(0, 1, (N_ALL_ITEMS,), bool),
                 "mask_destroy": gym.spaces.Box(0, 1, (N_ALL_ITEMS,), bool),
                 "mask_craft_smelt": gym.spaces.Box(0, 1, (len(ALL_CRAFT_SMELT_ITEMS),), bool),
@@ -119,6 +132,10 @@ class MineDojoWrapper(gym.Wrapper):
         return self._render_mode
 
     def __getattr__(self, name):
+        # Private names (pickle/copy probes, `_np_random`, ...) and `env` itself (before it is set)
+        # must not be forwarded, otherwise the lookup recurses into `__getattr__`
+        if name == "env" or name.startswith("_"):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
         return getattr(self.env, name)
 
     def _convert_inventory(self, inventory: Dict[str, Any]) -> np.ndarray:
@@ -182,7 +199,7 @@ class MineDojoWrapper(gym.Wrapper):
         }
 
     def _convert_action(self, action: np.ndarray) -> np.ndarray:
-        converted_action = ACTION_MAP[int(action[0])].copy()
+        converted_action = ACTION_TABLE[int(action[0])].copy()
         if self._sticky_attack:
             # 5 is the index of the functional actions (e.g., use, attack, equip, ...)
             # 3 is the value for the attack action
@@ -224,18 +241,34 @@ class MineDojoWrapper(gym.Wrapper):
         return converted_action
 
     def _convert_obs(self, obs: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        life_stats = obs["life_stats"]
         return {
             "rgb": obs["rgb"].copy(),
             "inventory": self._convert_inventory(obs["inventory"]),
             "inventory_max": self._inventory_max,
             "inventory_delta": self._convert_inventory_delta(obs["delta_inv"]),
             "equipment": self._convert_equipment(obs["equipment"]),
-            "life_stats": np.concatenate(
-                (obs["life_stats"]["life"], obs["life_stats"]["food"], obs["life_stats"]["oxygen"])
-            ),
+            "life_stats": np.concatenate((life_stats["life"], life_stats["food"], life_stats["oxygen"])),
             **self._convert_masks(obs["masks"]),
         }
 
+    def _update_pos(self, location_stats: Dict[str, Any]) -> None:
+        self._pos[_X : _Z + 1] = location_stats["pos"]
+        self._pos[_PITCH] = location_stats["pitch"].item()
+        self._pos[_YAW] = location_stats["yaw"].item()
+
+    @staticmethod
+    def _life_stats(life_stats: Dict[str, Any]) -> Dict[str, float]:
+        return {
+            "life": float(life_stats["life"].item()),
+            "oxygen": float(life_stats["oxygen"].item()),
+            "food": float(life_stats["food"].item()),
+        }
+
+    def _location_stats(self) -> Dict[str, float]:
+        x, y, z, pitch, yaw = self._pos.tolist()
+        return {"x": x, "y": y, "z": z, "pitch": pitch, "yaw": yaw}
+
     def seed(self, seed: Optional[int] = None) -> None:
         self.observation_space.seed(seed)
         self.action_space.seed(seed)
@@ -243,31 +276,24 @@ class MineDojoWrapper(gym.Wrapper):
     def step(self, action: np.ndarray) -> Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]:
         a = action
         action = self._convert_action(action)
-        next_pitch = self._pos["pitch"] + (action[3] - 12) * 15
-        if not (self._pitch_limits[0] <= next_pitch <= self._pitch_limits[1]):
-            action[3] = 12
+        # 12 is the no-op camera action, every step away from it changes the pitch by 15 degrees:
+        # the pitch movement is cancelled if it would exceed the pitch limits
+        pitch_delta = action[3] - 12
+        next_pitch = self._pos[_PITCH] + pitch_delta * 15
+        action[3] = 12 + pitch_delta * ((self._min_pitch <= next_pitch) & (next_pitch <= self._max_pitch))
 
         obs, reward, done, info = self.env.step(action)
         is_timelimit = info.get("TimeLimit.truncated", False)
         terminated = done and not is_timelimit
         truncated = done and is_timelimit
-        self._pos = {
-            "x": float(obs["location_stats"]["pos"][0]),
-            "y": float(obs["location_stats"]["pos"][1]),
-            "z": float(obs["location_stats"]["pos"][2]),
-            "pitch": float(obs["location_stats"]["pitch"].item()),
-            "yaw": float(obs["location_stats"]["yaw"].item()),
-        }
+        location_stats = obs["location_stats"]
+        self._update_pos(location_stats)
         info.update(
             {
-                "life_stats": {
-                    "life": float(obs["life_stats"]["life"].item()),
-                    "oxygen": float(obs["life_stats"]["oxygen"].item()),
-                    "food": float(obs["life_stats"]["food"].item()),
-                },
-                "location_stats": copy.deepcopy(self._pos),
+                "life_stats": self._life_stats(obs["life_stats"]),
+                "location_stats": self._location_stats(),
                 "action": a.tolist(),
-                "biomeid": float(obs["location_stats"]["biome_id"].item()),
+                "biomeid": float(location_stats["biome_id"].item()),
             }
         )
         return self._convert_obs(obs), reward, terminated, truncated, info
@@ -276,24 +302,15 @@ class MineDojoWrapper(gym.Wrapper):
         self, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
     ) -> Tuple[np.ndarray, Dict[str, Any]]:
         obs = self.env.reset()
-        self._pos = {
-            "x": float(obs["location_stats"]["pos"][0]),
-            "y": float(obs["location_stats"]["pos"][1]),
-            "z": float(obs["location_stats"]["pos"][2]),
-            "pitch": float(obs["location_stats"]["pitch"].item()),
-            "yaw": float(obs["location_stats"]["yaw"].item()),
-        }
+        location_stats = obs["location_stats"]
+        self._update_pos(location_stats)
         self._sticky_jump_counter = 0
         self._sticky_attack_counter = 0
         self._inventory_max = np.zeros(N_ALL_ITEMS)
         return self._convert_obs(obs), {
-            "life_stats": {
-                "life": float(obs["life_stats"]["life"].item()),
-                "oxygen": float(obs["life_stats"]["oxygen"].item()),
-                "food": float(obs["life_stats"]["food"].item()),
-            },
-            "location_stats": copy.deepcopy(self._pos),
-            "biomeid": float(obs["location_stats"]["biome_id"].item()),
+            "life_stats": self._life_stats(obs["life_stats"]),
+            "location_stats": self._location_stats(),
+            "biomeid": float(location_stats["biome_id"].item()),
         }
 
     def render(self) -> RenderFrame | list[RenderFrame] | None:
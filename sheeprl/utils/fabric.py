@@ -1,9 +1,12 @@
-from unittest import mock
+import os
 
 from lightning.fabric import Fabric
 from lightning.fabric.accelerators import XLAAccelerator
 from lightning.fabric.strategies import SingleDeviceStrategy, SingleDeviceXLAStrategy
 
+# Environment variables set by the Lightning CLI that would override the single-device Fabric arguments
+_LT_ENV_KEYS = ("LT_DEVICES", "LT_STRATEGY", "LT_NUM_NODES", "LT_PRECISION", "LT_ACCELERATOR")
+
 
 def get_single_device_fabric(fabric: Fabric) -> Fabric:
     """Get a single device fabric. The returned fabric will share the same accelerator,
@@ -25,11 +28,10 @@ def get_single_device_fabric(fabric: Fabric) -> Fabric:
         checkpoint_io=None,
         precision=fabric._precision,
     )
-    with mock.patch.dict("os.environ") as mocked_os_environ:
-        mocked_os_environ.pop("LT_DEVICES", None)
-        mocked_os_environ.pop("LT_STRATEGY", None)
-        mocked_os_environ.pop("LT_NUM_NODES", None)
-        mocked_os_environ.pop("LT_PRECISION", None)
-        mocked_os_environ.pop("LT_ACCELERATOR", None)
+    # Only the Lightning variables are removed and restored, instead of copying the whole environment
+    saved_env = {k: os.environ.pop(k) for k in _LT_ENV_KEYS if k in os.environ}
+    try:
         fabric = Fabric(strategy=strategy)
+    finally:
+        os.environ.update(saved_env)
     return fabric
@@ -48,6 +48,8 @@ def restore_env_variables():
         "XRT_MESH_SERVICE_ADDRESS",
         # set by torchdynamo
         "TRITON_CACHE_DIR",
+        # set by torchinductor when compiling the models
+        "_TORCHINDUCTOR_PYOBJECT_TENSOR_DATA_PTR",
         # set by Pygame
         "SDL_VIDEO_X11_WMCLASS",
         # set by us
@@ -68,9 +70,16 @@ def teardown_process_group():
         torch.distributed.destroy_process_group()
 
 
-def pytest_collection_modifyitems(items):
-    """Adds a timeout marker to all tests in test_algos.py."""
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False, help="run the tests marked as slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Adds a timeout marker to all tests in test_algos.py and skips the slow tests unless `--runslow` is given."""
     timeout = 60 if os.environ.get("MLFLOW_TRACKING_URI", None) is not None else 180
+    skip_slow = pytest.mark.skip(reason="slow test, run it with '--runslow'")
     for item in items:
+        if "slow" in item.keywords and not config.getoption("--runslow"):
+            item.add_marker(skip_slow)
         if "test_algos.py" in item.module.__name__:
             item.add_marker(pytest.mark.timeout(timeout))
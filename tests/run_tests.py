@@ -3,4 +3,5 @@ import sys
 import pytest
 
 if __name__ == "__main__":
-    sys.exit(pytest.main(["-s", "--cov=sheeprl", "-vv"]))
+    # Keep all the tests of a module on the same pytest-xdist worker
+    sys.exit(pytest.main(["-s", "--cov=sheeprl", "-vv", "-n", "auto", "--dist=loadfile", "--runslow"]))
@@ -7,6 +7,6 @@ import pytest
 if __name__ == "__main__":
     os.environ["MLFLOW_TRACKING_URI"] = "http://localhost:5000"
     p = subprocess.Popen(["mlflow", "ui", "--port", "5000"])
-    exit_code = pytest.main(["-s", "--cov=sheeprl", "-vv"])
+    exit_code = pytest.main(["-s", "--cov=sheeprl", "-vv", "--runslow"])
     p.terminate()
     sys.exit(exit_code)
@@ -7,9 +7,13 @@ from contextlib import nullcontext
 from unittest import mock
 
 import pytest
+import torch
 
 from sheeprl import ROOT_DIR
+from sheeprl.algos.ppo.agent import build_agent as ppo_build_agent
+from sheeprl.algos.ppo_recurrent.agent import build_agent as ppo_recurrent_build_agent
 from sheeprl.cli import run
+from sheeprl.models.models import CNN, MLP
 from sheeprl.utils.imports import _IS_WINDOWS
 
 
@@ -42,7 +46,9 @@ def standard_args():
 
 @pytest.fixture()
 def start_time():
-    return str(int(time.time()))
+    # The name of the pytest-xdist worker keeps the log folders of parallel test sessions apart,
+    # since they can start in the same second
+    return f"{int(time.time())}_{os.environ.get('PYTEST_XDIST_WORKER', 'gw0')}"
 
 
 @pytest.fixture(autouse=True)
@@ -61,6 +67,36 @@ def remove_test_dir(path: str) -> None:
         warnings.warn("Unable to delete folder {}.".format(path))
 
 
+def record_players(build_agent, players):
+    """Wraps a `build_agent` function so that the players it builds are appended to `players`."""
+
+    def wrapper(*args, **kwargs):
+        agent, player = build_agent(*args, **kwargs)
+        players.append(player)
+        return agent, player
+
+    return wrapper
+
+
+def assert_scripted_backbones(player) -> None:
+    """Checks that the MLP and CNN backbones of the player networks have been scripted."""
+    backbones = [
+        m
+        for module in (player.feature_extractor, player.actor, player.critic)
+        for m in module.modules()
+        if isinstance(m, (MLP, CNN))
+    ]
+    assert len(backbones) > 0
+    assert all(isinstance(m._model, torch.jit.RecursiveScriptModule) for m in backbones)
+
+
+PLAYER_ARGS = [
+    pytest.param([], id="eager"),
+    pytest.param(["algo.jit_player=True"], id="jit_player"),
+    pytest.param(["algo.compile_model=True"], id="compile_model", marks=pytest.mark.slow),
+]
+
+
 def test_droq(standard_args, start_time):
     root_dir = os.path.join(f"pytest_{start_time}", "droq", os.environ["LT_DEVICES"])
     run_name = "test_droq"
@@ -140,8 +176,7 @@ def test_sac_decoupled(standard_args, start_time):
         with pytest.raises(RuntimeError) if os.environ["LT_DEVICES"] == "1" else nullcontext():
             run()
 
-    if os.environ["LT_DEVICES"] != "1":
-        remove_test_dir(os.path.join("logs", "runs", f"pytest_{start_time}"))
+    remove_test_dir(os.path.join("logs", "runs", f"pytest_{start_time}"))
 
 
 def test_a2c(standard_args, start_time):
@@ -162,24 +197,36 @@ def test_a2c(standard_args, start_time):
     remove_test_dir(os.path.join("logs", "runs", f"pytest_{start_time}"))
 
 
+@pytest.mark.parametrize("player_args", PLAYER_ARGS)
 @pytest.mark.parametrize("env_id", ["discrete_dummy", "multidiscrete_dummy", "continuous_dummy"])
-def test_ppo(standard_args, start_time, env_id):
+def test_ppo(standard_args, start_time, env_id, player_args):
     root_dir = os.path.join(f"pytest_{start_time}", "ppo", os.environ["LT_DEVICES"])
     run_name = "test_ppo"
-    args = standard_args + [
-        "exp=ppo",
-        "env=dummy",
-        f"algo.rollout_steps={os.environ['LT_DEVICES']}",
-        "algo.per_rank_batch_size=1",
-        f"root_dir={root_dir}",
-        f"run_name={run_name}",
-        f"env.id={env_id}",
-        "algo.cnn_keys.encoder=[rgb]",
-        "algo.mlp_keys.encoder=[state]",
-    ]
-
-    with mock.patch.object(sys, "argv", args):
+    args = (
+        standard_args
+        + [
+            "exp=ppo",
+            "env=dummy",
+            f"algo.rollout_steps={os.environ['LT_DEVICES']}",
+            "algo.per_rank_batch_size=1",
+            f"root_dir={root_dir}",
+            f"run_name={run_name}",
+            f"env.id={env_id}",
+            "algo.cnn_keys.encoder=[rgb]",
+            "algo.mlp_keys.encoder=[state]",
+        ]
+        + player_args
+    )
+
+    players = []
+    with mock.patch.object(sys, "argv", args), mock.patch(
+        "sheeprl.algos.ppo.ppo.build_agent", record_players(ppo_build_agent, players)
+    ):
         run()
+    if "algo.jit_player=True" in player_args:
+        assert len(players) > 0
+        for player in players:
+            assert_scripted_backbones(player)
     remove_test_dir(os.path.join("logs", "runs", f"pytest_{start_time}"))
 
 
@@ -205,26 +252,37 @@ def test_ppo_decoupled(standard_args, start_time, env_id):
         with pytest.raises(RuntimeError) if os.environ["LT_DEVICES"] == "1" else nullcontext():
             run()
 
-    if os.environ["LT_DEVICES"] != "1":
-        remove_test_dir(os.path.join("logs", "runs", f"pytest_{start_time}"))
+    remove_test_dir(os.path.join("logs", "runs", f"pytest_{start_time}"))
 
 
-def test_ppo_recurrent(standard_args, start_time):
+@pytest.mark.parametrize("player_args", PLAYER_ARGS + [pytest.param(["algo.num_test_envs=2"], id="num_test_envs_2")])
+def test_ppo_recurrent(standard_args, start_time, player_args):
     root_dir = os.path.join(f"pytest_{start_time}", "ppo_recurrent", os.environ["LT_DEVICES"])
     run_name = "test_ppo_recurrent"
-    args = standard_args + [
-        "exp=ppo_recurrent",
-        "algo.rollout_steps=2",
-        "algo.per_rank_batch_size=1",
-        "algo.per_rank_sequence_length=2",
-        "algo.update_epochs=2",
-        "fabric.precision=32",
-        f"root_dir={root_dir}",
-        f"run_name={run_name}",
-    ]
-
-    with mock.patch.object(sys, "argv", args):
+    args = (
+        standard_args
+        + [
+            "exp=ppo_recurrent",
+            "algo.rollout_steps=2",
+            "algo.per_rank_batch_size=1",
+            "algo.per_rank_sequence_length=2",
+            "algo.update_epochs=2",
+            "fabric.precision=32",
+            f"root_dir={root_dir}",
+            f"run_name={run_name}",
+        ]
+        + player_args
+    )
+
+    players = []
+    with mock.patch.object(sys, "argv", args), mock.patch(
+        "sheeprl.algos.ppo_recurrent.ppo_recurrent.build_agent", record_players(ppo_recurrent_build_agent, players)
+    ):
         run()
+    if "algo.jit_player=True" in player_args:
+        assert len(players) > 0
+        for player in players:
+            assert_scripted_backbones(player)
     remove_test_dir(os.path.join("logs", "runs", f"pytest_{start_time}"))
 
 
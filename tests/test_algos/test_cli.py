@@ -1,201 +1,198 @@
 import os
-import shutil
+import re
 import subprocess
 import sys
-import warnings
+from pathlib import Path
+from typing import Dict, List
 from unittest import mock
 
 import pytest
+from hydra import compose, initialize_config_dir
+from omegaconf import DictConfig, OmegaConf
 
 from sheeprl import ROOT_DIR
-from sheeprl.cli import run
-
-
-def test_dp_strategy_str_warning():
-    args = [
-        os.path.join(ROOT_DIR, "__main__.py"),
-        "exp=ppo",
-        "fabric.strategy=dp",
-        "fabric.devices=1",
-        "dry_run=True",
-        "algo.rollout_steps=1",
-        "metric.log_level=0",
-    ]
-    with mock.patch.object(sys, "argv", args):
-        with pytest.warns(UserWarning) as record:
-            run()
-        assert len(record) >= 1
-        assert (
-            record[0].message.args[0] == "Running an algorithm with a strategy (dp) different "
-            "than 'auto' or 'dpp' can cause unexpected problems. "
-            "Please launch the script with a 'DDP' strategy with 'python sheeprl.py fabric.strategy=ddp' "
-            "or the 'auto' one with 'python sheeprl.py fabric.strategy=auto' if you run into any problems."
-        )
+from sheeprl.cli import check_configs, run
+from sheeprl.utils.utils import dotdict
+
+_MAIN = os.path.join(ROOT_DIR, "__main__.py")
+# Overrides shared by the PPO dry runs
+_PPO_DRY_RUN_ARGS = [
+    "dry_run=True",
+    "fabric.accelerator=cpu",
+    "algo.rollout_steps=1",
+    "algo.cnn_keys.encoder=[]",
+    "algo.mlp_keys.encoder=[state]",
+    "env.capture_video=False",
+    "checkpoint.save_last=False",
+    "metric.log_level=0",
+    "metric.disable_timer=True",
+]
+# Overrides of a tiny DreamerV3 agent whose dry run saves a checkpoint
+_DREAMER_V3_CKPT_ARGS = [
+    "exp=dreamer_v3",
+    "env=dummy",
+    "dry_run=True",
+    "fabric.accelerator=cpu",
+    "env.capture_video=False",
+    "algo.dense_units=8",
+    "algo.horizon=8",
+    "algo.cnn_keys.encoder=[]",
+    "algo.cnn_keys.decoder=[]",
+    "algo.mlp_keys.encoder=[state]",
+    "algo.mlp_keys.decoder=[state]",
+    "algo.replay_ratio=1",
+    "algo.world_model.recurrent_model.recurrent_state_size=8",
+    "algo.world_model.representation_model.hidden_size=8",
+    "algo.learning_starts=0",
+    "algo.world_model.transition_model.hidden_size=8",
+    "buffer.size=10",
+    "algo.per_rank_batch_size=1",
+    "algo.per_rank_sequence_length=1",
+    "checkpoint.save_last=True",
+    "metric.log_level=0",
+    "metric.disable_timer=True",
+]
+
+_DP_STR_WARNING = re.compile(r"^Running an algorithm with a strategy \(dp\) different than 'auto' or 'dpp'")
+_DP_INSTANCE_WARNING = re.compile(
+    r"^Running an algorithm with a strategy \(DataParallelStrategy\) "
+    r"different than 'SingleDeviceStrategy' or 'DDPStrategy'"
+)
+_DECOUPLED_STRATEGY_ERROR = re.compile(
+    r"\w+ is currently not supported for decoupled algorithms\. "
+    r"Please launch the script with a 'DDP' strategy with 'python sheeprl\.py fabric\.strategy=ddp'"
+)
+
+
+def _subprocess_env() -> Dict[str, str]:
+    """Environment of the CLI subprocesses: no bytecode is written to the source tree, hashing is deterministic
+    and CUDA is hidden, since the tests only exercise the CPU path."""
+    return {**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "PYTHONHASHSEED": "0", "CUDA_VISIBLE_DEVICES": ""}
+
+
+def _latest_checkpoint(run_dir: Path) -> Path:
+    """Return the most recently written checkpoint among all the versions of a run."""
+    return max(run_dir.glob("version_*/checkpoint/*"), key=lambda p: p.stat().st_mtime)
+
+
+def _tmp_run_args(tmp_path: Path) -> List[str]:
+    """Overrides that make both the experiment and the Hydra outputs land in `tmp_path`."""
+    return [f"root_dir={tmp_path}", "run_name=test_run", f"hydra.run.dir={tmp_path / 'test_run'}"]
+
+
+@pytest.fixture(scope="module")
+def ppo_cfg():
+    """Compose the PPO experiment configuration once for the tests that only check its validation."""
+    with initialize_config_dir(config_dir=os.path.join(ROOT_DIR, "configs"), version_base="1.3"):
+        return compose(config_name="config", overrides=["exp=ppo"])
+
+
+def _with_overrides(cfg: DictConfig, overrides: List[str]) -> dotdict:
+    cfg = OmegaConf.merge(cfg, OmegaConf.from_dotlist(overrides))
+    return dotdict(OmegaConf.to_container(cfg, resolve=True, throw_on_missing=True))
+
+
+def test_dp_strategy_str_warning(ppo_cfg):
+    cfg = _with_overrides(ppo_cfg, ["fabric.strategy=dp", "fabric.devices=1"])
+    with pytest.warns(UserWarning, match=_DP_STR_WARNING):
+        check_configs(cfg)
+
+
+def test_module_not_found(ppo_cfg):
+    cfg = _with_overrides(ppo_cfg, ["algo.name=not_found"])
+    with pytest.raises(
+        RuntimeError, match="Given the algorithm named 'not_found', no module has been found to be imported."
+    ):
+        check_configs(cfg)
 
 
-def test_module_not_found():
-    args = [os.path.join(ROOT_DIR, "__main__.py"), "exp=ppo", "algo.name=not_found", "metric.log_level=0"]
+def test_dp_strategy_instance_warning(tmp_path):
+    args = [_MAIN, "exp=test_decoupled_strategy_instance", "algo=ppo", "validate_only=True"] + _tmp_run_args(tmp_path)
     with mock.patch.object(sys, "argv", args):
-        with pytest.raises(
-            RuntimeError, match="Given the algorithm named 'not_found', no module has been found to be imported."
-        ):
+        with pytest.warns(UserWarning, match=_DP_INSTANCE_WARNING):
             run()
 
 
-def test_dp_strategy_instance_warning():
-    args = [
-        os.path.join(ROOT_DIR, "__main__.py"),
-        "exp=test_decoupled_strategy_instance",
-        "algo=ppo",
-        "algo.rollout_steps=1",
-        "metric.log_level=0",
-    ]
-    with mock.patch.object(sys, "argv", args):
-        with pytest.warns(UserWarning) as record:
-            run()
-        assert len(record) >= 1
-        assert (
-            record[0].message.args[0] == "Running an algorithm with a strategy (DataParallelStrategy) "
-            "different than 'SingleDeviceStrategy' or 'DDPStrategy' can cause unexpected problems. "
-            "Please launch the script with a 'DDP' strategy with 'python sheeprl.py fabric.strategy=ddp' "
-            "or with a single device with 'python sheeprl.py fabric.strategy=auto fabric.devices=1' "
-            "if you run into any problems."
-        )
-
-
-def test_decoupled_strategy_instance_fail():
-    args = [os.path.join(ROOT_DIR, "__main__.py"), "exp=test_decoupled_strategy_instance", "metric.log_level=0"]
+def test_decoupled_strategy_instance_fail(tmp_path):
+    args = [_MAIN, "exp=test_decoupled_strategy_instance", "validate_only=True"] + _tmp_run_args(tmp_path)
     with pytest.raises(
         ValueError,
-        match=r"\w+ is currently not supported for decoupled algorithms. "
-        "Please launch the script with a 'DDP' strategy with 'python sheeprl.py fabric.strategy=ddp'",
+        match=_DECOUPLED_STRATEGY_ERROR,
     ):
         with mock.patch.object(sys, "argv", args):
             run()
 
 
-def test_strategy_warning():
-    args = [
-        os.path.join(ROOT_DIR, "__main__.py"),
-        "exp=ppo",
-        "fabric.strategy=dp",
-        "fabric.devices=1",
-        "dry_run=True",
-        "algo.rollout_steps=1",
-        "metric.log_level=0",
-    ]
+@pytest.mark.slow
+def test_run_decoupled_algo(tmp_path):
+    args = [_MAIN, "exp=ppo_decoupled", "fabric.strategy=ddp", "fabric.devices=2"] + _PPO_DRY_RUN_ARGS
+    args += _tmp_run_args(tmp_path)
     with mock.patch.object(sys, "argv", args):
-        with pytest.warns(UserWarning) as record:
-            run()
-        assert len(record) >= 1
-        assert (
-            record[0].message.args[0] == "Running an algorithm with a strategy (dp) "
-            "different than 'auto' or 'dpp' can cause unexpected problems. "
-            "Please launch the script with a 'DDP' strategy with 'python sheeprl.py fabric.strategy=ddp' "
-            "or the 'auto' one with 'python sheeprl.py fabric.strategy=auto' if you run into any problems."
-        )
-
-
-def test_run_decoupled_algo():
-    subprocess.run(
-        sys.executable + " sheeprl.py exp=ppo_decoupled fabric.strategy=ddp fabric.devices=2 "
-        "dry_run=True algo.rollout_steps=1 algo.cnn_keys.encoder=[rgb] algo.mlp_keys.encoder=[state] "
-        "env.capture_video=False checkpoint.save_last=False metric.log_level=0 "
-        "metric.disable_timer=True",
-        shell=True,
-        check=True,
-    )
+        run()
 
 
-def test_run_algo():
-    subprocess.run(
-        sys.executable + " sheeprl.py exp=ppo dry_run=True algo.rollout_steps=1 "
-        "algo.cnn_keys.encoder=[rgb] algo.mlp_keys.encoder=[state] "
-        "env.capture_video=False checkpoint.save_last=False metric.log_level=0 "
-        "metric.disable_timer=True",
-        shell=True,
-        check=True,
-    )
+@pytest.mark.slow
+def test_run_algo(tmp_path):
+    args = [_MAIN, "exp=ppo"] + _PPO_DRY_RUN_ARGS + _tmp_run_args(tmp_path)
+    with mock.patch.object(sys, "argv", args):
+        run()
 
 
-def test_resume_from_checkpoint():
-    root_dir = "pytest_test_ckpt"
+@pytest.mark.slow
+def test_resume_from_checkpoint(tmp_path):
+    # Absolute root directories make both the experiment and the Hydra outputs land in `tmp_path`
+    root_dir = tmp_path / "ckpt"
     run_name = "test_ckpt"
-    subprocess.run(
-        sys.executable + " sheeprl.py exp=dreamer_v3 env=dummy dry_run=True "
-        "env.capture_video=False algo.dense_units=8 algo.horizon=8 "
-        "algo.cnn_keys.encoder=[rgb] algo.cnn_keys.decoder=[rgb] "
-        "algo.mlp_keys.encoder=[state] algo.mlp_keys.decoder=[state] "
-        "algo.world_model.encoder.cnn_channels_multiplier=2 algo.replay_ratio=1 "
-        "algo.world_model.recurrent_model.recurrent_state_size=8 "
-        "algo.world_model.representation_model.hidden_size=8 algo.learning_starts=0 "
-        "algo.world_model.transition_model.hidden_size=8 buffer.size=10 "
-        "algo.per_rank_batch_size=1 algo.per_rank_sequence_length=1 "
-        f"root_dir={root_dir} run_name={run_name} "
-        "checkpoint.save_last=True metric.log_level=0 metric.disable_timer=True",
-        shell=True,
-        check=True,
-    )
-
-    ckpt_root = os.path.join("logs", "runs", root_dir, run_name)
-    ckpt_dir = sorted([d for d in os.listdir(ckpt_root) if "version" in d])[-1]
-    ckpt_path = os.path.join(ckpt_root, ckpt_dir, "checkpoint")
-    ckpt_file_name = os.listdir(ckpt_path)[-1]
-    ckpt_path = os.path.join(ckpt_path, ckpt_file_name)
-    subprocess.run(
-        sys.executable
-        + f" sheeprl.py exp=dreamer_v3 env=dummy checkpoint.resume_from={ckpt_path} "
-        + "root_dir=pytest_resume_ckpt run_name=test_resume metric.log_level=0 "
-        + "algo.cnn_keys.encoder=[rgb] algo.cnn_keys.decoder=[rgb] "
-        + "algo.mlp_keys.encoder=[state] algo.mlp_keys.decoder=[state]",
-        shell=True,
-        check=True,
-    )
+    args = [_MAIN] + _DREAMER_V3_CKPT_ARGS
+    args += [f"root_dir={root_dir}", f"run_name={run_name}", f"hydra.run.dir={root_dir / run_name}"]
+    with mock.patch.object(sys, "argv", args):
+        run()
 
-    try:
-        path = os.path.join("logs", "runs", "pytest_test_ckpt")
-        shutil.rmtree(path)
-    except (OSError, WindowsError):
-        warnings.warn("Unable to delete folder {}.".format(path))
-    try:
-        path = os.path.join("logs", "runs", "pytest_resume_ckpt")
-        shutil.rmtree(path)
-    except (OSError, WindowsError):
-        warnings.warn("Unable to delete folder {}.".format(path))
+    ckpt_path = _latest_checkpoint(root_dir / run_name)
+    args = [
+        _MAIN,
+        "exp=dreamer_v3",
+        "env=dummy",
+        f"checkpoint.resume_from={ckpt_path}",
+        f"root_dir={tmp_path / 'resume'}",
+        "run_name=test_resume",
+        f"hydra.run.dir={tmp_path / 'resume' / 'test_resume'}",
+        "metric.log_level=0",
+        "algo.cnn_keys.encoder=[]",
+        "algo.cnn_keys.decoder=[]",
+        "algo.mlp_keys.encoder=[state]",
+        "algo.mlp_keys.decoder=[state]",
+    ]
+    with mock.patch.object(sys, "argv", args):
+        run()
 
 
-def test_resume_from_checkpoint_env_error():
-    root_dir = "pytest_test_ckpt"
+@pytest.fixture(scope="module")
+def dreamer_v3_checkpoint(tmp_path_factory):
+    """Train a tiny DreamerV3 agent in a separate process once for the whole module
+    and return the path to its checkpoint."""
+    root_dir = tmp_path_factory.mktemp("shared_ckpt")
     run_name = "test_ckpt"
     subprocess.run(
-        sys.executable + " sheeprl.py exp=dreamer_v3 env=dummy dry_run=True "
-        "env.capture_video=False algo.dense_units=8 algo.horizon=8 "
-        "algo.cnn_keys.encoder=[rgb] algo.cnn_keys.decoder=[rgb] "
-        "algo.mlp_keys.encoder=[state] algo.mlp_keys.decoder=[state] "
-        "algo.world_model.encoder.cnn_channels_multiplier=2 algo.replay_ratio=1 "
-        "algo.world_model.recurrent_model.recurrent_state_size=8 "
-        "algo.world_model.representation_model.hidden_size=8 algo.learning_starts=0 "
-        "algo.world_model.transition_model.hidden_size=8 buffer.size=10 "
-        "algo.per_rank_batch_size=1 algo.per_rank_sequence_length=1 "
-        f"root_dir={root_dir} run_name={run_name} "
-        "checkpoint.save_last=True metric.log_level=0 metric.disable_timer=True",
-        shell=True,
+        [sys.executable, "sheeprl.py"]
+        + _DREAMER_V3_CKPT_ARGS
+        + [f"root_dir={root_dir}", f"run_name={run_name}", f"hydra.run.dir={root_dir / run_name}"],
         check=True,
+        env=_subprocess_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
     )
+    return _latest_checkpoint(root_dir / run_name)
+
 
-    ckpt_root = os.path.join("logs", "runs", root_dir, run_name)
-    ckpt_dir = sorted([d for d in os.listdir(ckpt_root) if "version" in d])[-1]
-    ckpt_path = os.path.join(ckpt_root, ckpt_dir, "checkpoint")
-    ckpt_file_name = os.listdir(ckpt_path)[-1]
-    ckpt_path = os.path.join(ckpt_path, ckpt_file_name)
+@pytest.mark.slow
+def test_resume_from_checkpoint_env_error(dreamer_v3_checkpoint, tmp_path):
     args = [
-        os.path.join(ROOT_DIR, "__main__.py"),
+        _MAIN,
         "exp=dreamer_v3",
-        f"checkpoint.resume_from={ckpt_path}",
-        "root_dir=pytest_resume_ckpt",
-        "run_name=test_resume",
+        f"checkpoint.resume_from={dreamer_v3_checkpoint}",
         "metric.log_level=0",
-    ]
+    ] + _tmp_run_args(tmp_path)
     with mock.patch.object(sys, "argv", args):
         with pytest.raises(
             ValueError,
@@ -206,52 +203,16 @@ def test_resume_from_checkpoint_env_error():
         ):
             run()
 
-    try:
-        path = os.path.join("logs", "runs", "pytest_test_ckpt")
-        shutil.rmtree(path)
-    except (OSError, WindowsError):
-        warnings.warn("Unable to delete folder {}.".format(path))
-    try:
-        path = os.path.join("logs", "runs", "pytest_resume_ckpt")
-        shutil.rmtree(path)
-    except (OSError, WindowsError):
-        warnings.warn("Unable to delete folder {}.".format(path))
-
-
-def test_resume_from_checkpoint_algo_error():
-    root_dir = "pytest_test_ckpt"
-    run_name = "test_ckpt"
-    subprocess.run(
-        sys.executable + " sheeprl.py exp=dreamer_v3 env=dummy dry_run=True "
-        "env.capture_video=False algo.dense_units=8 algo.horizon=8 "
-        "algo.cnn_keys.encoder=[rgb] algo.cnn_keys.decoder=[rgb] "
-        "algo.mlp_keys.encoder=[state] algo.mlp_keys.decoder=[state] "
-        "algo.world_model.encoder.cnn_channels_multiplier=2 algo.replay_ratio=1 "
-        "algo.world_model.recurrent_model.recurrent_state_size=8 "
-        "algo.world_model.representation_model.hidden_size=8 algo.learning_starts=0 "
-        "algo.world_model.transition_model.hidden_size=8 buffer.size=10 "
-        "algo.per_rank_batch_size=1 algo.per_rank_sequence_length=1 "
-        f"root_dir={root_dir} run_name={run_name} "
-        "checkpoint.save_last=True metric.log_level=0 metric.disable_timer=True",
-        shell=True,
-        check=True,
-    )
 
-    ckpt_root = os.path.join("logs", "runs", root_dir, run_name)
-    ckpt_dir = sorted([d for d in os.listdir(ckpt_root) if "version" in d])[-1]
-    ckpt_path = os.path.join(ckpt_root, ckpt_dir, "checkpoint")
-    ckpt_file_name = os.listdir(ckpt_path)[-1]
-    ckpt_path = os.path.join(ckpt_path, ckpt_file_name)
+@pytest.mark.slow
+def test_resume_from_checkpoint_algo_error(dreamer_v3_checkpoint, tmp_path):
     args = [
-        os.path.join(ROOT_DIR, "__main__.py"),
+        _MAIN,
         "exp=ppo",
         "env=dummy",
-        f"checkpoint.resume_from={ckpt_path}",
-        "root_dir=pytest_resume_ckpt",
-        "run_name=test_resume",
+        f"checkpoint.resume_from={dreamer_v3_checkpoint}",
         "metric.log_level=0",
-    ]
-    print(args)
+    ] + _tmp_run_args(tmp_path)
     with mock.patch.object(sys, "argv", args):
         with pytest.raises(
             ValueError,
@@ -262,53 +223,14 @@ def test_resume_from_checkpoint_algo_error():
         ):
             run()
 
-    try:
-        path = os.path.join("logs", "runs", "pytest_test_ckpt")
-        shutil.rmtree(path)
-    except (OSError, WindowsError):
-        warnings.warn("Unable to delete folder {}.".format(path))
-    try:
-        path = os.path.join("logs", "runs", "pytest_resume_ckpt")
-        shutil.rmtree(path)
-    except (OSError, WindowsError):
-        warnings.warn("Unable to delete folder {}.".format(path))
-
-
-def test_evaluate():
-    root_dir = "pytest_test_evaluate"
-    run_name = "test_evaluate"
-    subprocess.run(
-        sys.executable + " sheeprl.py exp=dreamer_v3 env=dummy dry_run=True "
-        "env.capture_video=False algo.dense_units=8 algo.horizon=8 "
-        "algo.cnn_keys.encoder=[rgb] algo.cnn_keys.decoder=[rgb] "
-        "algo.mlp_keys.encoder=[state] algo.mlp_keys.decoder=[state] "
-        "algo.world_model.encoder.cnn_channels_multiplier=2 algo.replay_ratio=1 "
-        "algo.world_model.recurrent_model.recurrent_state_size=8 "
-        "algo.world_model.representation_model.hidden_size=8 algo.learning_starts=0 "
-        "algo.world_model.transition_model.hidden_size=8 buffer.size=10 "
-        "algo.per_rank_batch_size=1 algo.per_rank_sequence_length=1 "
-        f"root_dir={root_dir} run_name={run_name} "
-        "checkpoint.save_last=True metric.log_level=0 metric.disable_timer=True",
-        shell=True,
-        check=True,
-    )
 
-    ckpt_root = os.path.join("logs", "runs", root_dir, run_name)
-    ckpt_dir = sorted([d for d in os.listdir(ckpt_root) if "version" in d])[-1]
-    ckpt_path = os.path.join(ckpt_root, ckpt_dir, "checkpoint")
-    ckpt_file_name = os.listdir(ckpt_path)[-1]
-    ckpt_path = os.path.join(ckpt_path, ckpt_file_name)
-    try:
-        subprocess.run(
-            sys.executable + f" sheeprl_eval.py checkpoint_path={ckpt_path} env.capture_video=False",
-            shell=True,
-            check=True,
-        )
-    except subprocess.CalledProcessError as e:
-        print(e.output)
-
-    try:
-        path = os.path.join("logs", "runs", "pytest_test_evaluate")
-        shutil.rmtree(path)
-    except (OSError, WindowsError):
-        warnings.warn("Unable to delete folder {}.".format(path))
+@pytest.mark.slow
+def test_evaluate(dreamer_v3_checkpoint):
+    result = subprocess.run(
+        [sys.executable, "sheeprl_eval.py", f"checkpoint_path={dreamer_v3_checkpoint}", "env.capture_video=False"],
+        env=_subprocess_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,174 @@
+from typing import Sequence
+from unittest import mock
+
+import gymnasium as gym
+import numpy as np
+import pytest
+import torch
+from torch import nn
+from torch.distributions import OneHotCategorical
+
+from sheeprl.algos.ppo.agent import PPOActor, PPOAgent, PPOPlayer, _has_equal_heads, fuse_heads_optimizer_state
+from sheeprl.utils.utils import dotdict
+
+_OBS_DIM = 4
+_BATCH_SIZE = 8
+
+
+def _ppo_agent(actions_dim: Sequence[int]) -> PPOAgent:
+    mlp_cfg = {"dense_units": 16, "mlp_layers": 1, "dense_act": "torch.nn.Tanh", "layer_norm": False}
+    return PPOAgent(
+        actions_dim=actions_dim,
+        obs_space=gym.spaces.Dict({"state": gym.spaces.Box(-1, 1, (_OBS_DIM,), np.float32)}),
+        encoder_cfg=dotdict({**mlp_cfg, "cnn_features_dim": 16, "mlp_features_dim": 16, "ortho_init": False}),
+        actor_cfg=dotdict(mlp_cfg),
+        critic_cfg=dotdict(mlp_cfg),
+        cnn_keys=[],
+        mlp_keys=["state"],
+        screen_size=64,
+        distribution_cfg=dotdict({"type": "auto"}),
+        is_continuous=False,
+    )
+
+
+def _per_head_agent(actions_dim: Sequence[int]) -> PPOAgent:
+    """A PPO agent with one head per discrete action, as the ones saved before the heads were fused."""
+    agent = _ppo_agent(actions_dim)
+    heads = nn.ModuleList([nn.Linear(agent.actor.actor_heads[0].in_features, a) for a in actions_dim])
+    agent.actor = PPOActor(agent.actor.actor_backbone, heads, is_continuous=False, distribution="discrete")
+    return agent
+
+
+def _obs():
+    return {"state": torch.rand(_BATCH_SIZE, _OBS_DIM)}
+
+
+def _per_head_log_prob_and_entropy(agent: PPOAgent, obs, actions):
+    actor_out = agent.actor(agent.feature_extractor(obs))
+    dists = [OneHotCategorical(logits=logits) for logits in actor_out]
+    log_prob = torch.stack([d.log_prob(a) for d, a in zip(dists, actions)], dim=-1).sum(dim=-1, keepdim=True)
+    entropy = torch.stack([d.entropy() for d in dists], dim=-1).sum(dim=-1, keepdim=True)
+    return log_prob, entropy
+
+
+@pytest.mark.parametrize("actions_dim", [[3, 3], [3, 4]])
+def test_ppo_agent_discrete_heads_match_per_head_distributions(actions_dim):
+    agent = _ppo_agent(actions_dim)
+    obs = _obs()
+    with torch.no_grad():
+        actions, _, _, _ = agent(obs)
+        with mock.patch("sheeprl.algos.ppo.agent.OneHotCategorical", wraps=OneHotCategorical) as dist_cls:
+            out_actions, log_prob, entropy, _ = agent(obs, list(actions))
+        expected_log_prob, expected_entropy = _per_head_log_prob_and_entropy(agent, obs, actions)
+
+    # Equal heads share a single distribution over the stacked logits, the others keep one distribution per head
+    is_stacked = len(set(actions_dim)) == 1
+    assert _has_equal_heads(agent.actor(agent.feature_extractor(obs))) == is_stacked
+    assert dist_cls.call_count == (1 if is_stacked else len(actions_dim))
+    assert [a.shape for a in out_actions] == [(_BATCH_SIZE, a) for a in actions_dim]
+    for out_a, a in zip(out_actions, actions):
+        assert torch.equal(out_a, a)
+    assert log_prob.shape == entropy.shape == (_BATCH_SIZE, 1)
+    torch.testing.assert_close(log_prob, expected_log_prob)
+    torch.testing.assert_close(entropy, expected_entropy)
+
+
+@pytest.mark.parametrize("actions_dim", [[3, 3], [3, 4]])
+def test_ppo_player_discrete_heads_match_per_head_distributions(actions_dim):
+    agent = _ppo_agent(actions_dim)
+    player = PPOPlayer(agent.feature_extractor, agent.actor, agent.critic)
+    obs = _obs()
+    with torch.no_grad():
+        actions, log_prob, _ = player(obs)
+        expected_log_prob, _ = _per_head_log_prob_and_entropy(agent, obs, actions)
+        greedy_actions = player.get_actions(obs, greedy=True)
+        actor_out = agent.actor(agent.feature_extractor(obs))
+
+    assert [a.shape for a in actions] == [(_BATCH_SIZE, a) for a in actions_dim]
+    assert all(torch.all(a.sum(dim=-1) == 1) for a in actions)
+    torch.testing.assert_close(log_prob, expected_log_prob)
+    for a, logits in zip(greedy_actions, actor_out):
+        assert torch.equal(a, OneHotCategorical(logits=logits).mode)
+
+
+def test_ppo_actor_fused_head_forward():
+    actions_dim = [2, 3, 4]
+    agent = _ppo_agent(actions_dim)
+    assert len(agent.actor.actor_heads) == 1
+    feat = agent.feature_extractor(_obs())
+    head = agent.actor.actor_heads[0]
+    with torch.no_grad():
+        actor_out = agent.actor(feat)
+        x = agent.actor.actor_backbone(feat)
+        weights = head.weight.split(actions_dim)
+        biases = head.bias.split(actions_dim)
+        expected = [nn.functional.linear(x, w, b) for w, b in zip(weights, biases)]
+
+    assert [out.shape for out in actor_out] == [(_BATCH_SIZE, a) for a in actions_dim]
+    for out, e in zip(actor_out, expected):
+        torch.testing.assert_close(out, e)
+
+
+def test_ppo_actor_loads_per_head_state_dict():
+    actions_dim = [2, 3, 4]
+    old_agent = _per_head_agent(actions_dim)
+    old_state = old_agent.state_dict()
+    agent = _ppo_agent(actions_dim)
+    agent.load_state_dict(old_state)
+
+    # The state given to 'load_state_dict' is left untouched
+    assert "actor.actor_heads.2.weight" in old_state
+    obs = _obs()
+    with torch.no_grad():
+        for out, old_out in zip(
+            agent.actor(agent.feature_extractor(obs)), old_agent.actor(old_agent.feature_extractor(obs))
+        ):
+            torch.testing.assert_close(out, old_out)
+
+
+def test_ppo_actor_fused_state_dict_round_trip():
+    actions_dim = [2, 3, 4]
+    agent = _ppo_agent(actions_dim)
+    state = agent.state_dict()
+    assert not any(k.startswith("actor.actor_heads.1.") for k in state)
+    new_agent = _ppo_agent(actions_dim)
+    new_agent.load_state_dict(state)
+    for k, v in new_agent.state_dict().items():
+        assert torch.equal(v, state[k])
+
+
+@pytest.mark.parametrize("with_buffer", [False, True])
+def test_fuse_heads_optimizer_state(with_buffer):
+    actions_dim = [2, 3, 4]
+    old_agent = _per_head_agent(actions_dim)
+    agent = _ppo_agent(actions_dim)
+    if with_buffer:
+        # The buffers of the agent state come before the parameters of the feature extractor
+        old_agent.feature_extractor.register_buffer("stat", torch.zeros(1))
+        agent.feature_extractor.register_buffer("stat", torch.zeros(1))
+    old_optimizer = torch.optim.Adam(old_agent.parameters(), lr=1e-3)
+    _, log_prob, entropy, values = old_agent(_obs())
+    (log_prob + entropy + values).mean().backward()
+    old_optimizer.step()
+    old_optimizer_state = old_optimizer.state_dict()
+    old_states = dict(zip((n for n, _ in old_agent.named_parameters()), old_optimizer_state["state"].values()))
+
+    agent.load_state_dict(old_agent.state_dict())
+    optimizer = torch.optim.Adam(agent.parameters(), lr=1e-3)
+    optimizer.load_state_dict(fuse_heads_optimizer_state(agent, old_agent.state_dict(), old_optimizer_state))
+
+    for (name, p), p_state in zip(agent.named_parameters(), optimizer.state_dict()["state"].values()):
+        if name.startswith("actor.actor_heads.0."):
+            param_name = name.rsplit(".", 1)[-1]
+            head_states = [old_states[f"actor.actor_heads.{i}.{param_name}"] for i in range(len(actions_dim))]
+            expected = torch.cat([s["exp_avg"] for s in head_states])
+        else:
+            expected = old_states[name]["exp_avg"]
+        assert p_state["exp_avg"].shape == p.shape
+        assert torch.equal(p_state["exp_avg"], expected)
+
+
+def test_fuse_heads_optimizer_state_leaves_fused_checkpoints_untouched():
+    agent = _ppo_agent([2, 3, 4])
+    optimizer_state = torch.optim.Adam(agent.parameters()).state_dict()
+    assert fuse_heads_optimizer_state(agent, agent.state_dict(), optimizer_state) is optimizer_state
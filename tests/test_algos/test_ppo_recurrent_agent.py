@@ -0,0 +1,41 @@
+import os
+
+import gymnasium as gym
+import numpy as np
+import pytest
+import torch
+from hydra import compose, initialize_config_dir
+from lightning import Fabric
+from omegaconf import OmegaConf
+
+from sheeprl import ROOT_DIR
+from sheeprl.algos.ppo_recurrent.agent import build_agent
+from sheeprl.utils.utils import dotdict
+
+
+@pytest.mark.parametrize(
+    "accelerator",
+    [
+        "cpu",
+        # With cuDNN, flattening the LSTM weights re-allocates them
+        pytest.param("cuda", marks=pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA not available")),
+    ],
+)
+def test_build_agent_ties_flattened_lstm_weights(accelerator):
+    overrides = ["exp=ppo_recurrent", "algo.cnn_keys.encoder=[]", "algo.mlp_keys.encoder=[state]", "env.num_envs=2"]
+    with initialize_config_dir(config_dir=os.path.join(ROOT_DIR, "configs"), version_base="1.3"):
+        cfg = dotdict(OmegaConf.to_container(compose(config_name="config", overrides=overrides), resolve=True))
+    fabric = Fabric(accelerator=accelerator, devices=1)
+    obs_space = gym.spaces.Dict({"state": gym.spaces.Box(-1, 1, (4,), np.float32)})
+    agent, player = build_agent(fabric, [3], False, cfg, obs_space)
+
+    agent_params = list(agent.rnn.parameters())
+    player_params = list(player.rnn.parameters())
+    assert len(agent_params) == len(player_params) > 0
+    for agent_p, player_p in zip(agent_params, player_params):
+        assert agent_p.data_ptr() == player_p.data_ptr()
+
+    # The tied weights are still shared after an update of the agent
+    with torch.no_grad():
+        agent_params[0].add_(1.0)
+    assert torch.equal(agent_params[0], player_params[0])
@@ -1,6 +1,5 @@
 import os
 import shutil
-import time
 
 import numpy as np
 import pytest
@@ -71,6 +70,51 @@ def test_replay_buffer_add_tds_exceeding_buf_size_multiple_times():
     np.testing.assert_allclose(rb["a"][: rb._pos], td3["a"][rb.buffer_size - rb._pos + remainder :])
 
 
+def test_replay_buffer_add_exact_fit_from_nonzero_pos():
+    buf_size = 5
+    n_envs = 1
+    rb = ReplayBuffer(buf_size, n_envs)
+    td1 = {"a": np.random.rand(3, 1, 1)}
+    td2 = {"a": np.random.rand(2, 1, 1)}
+    rb.add(td1)
+    rb.add(td2)
+    assert rb.full
+    assert rb._pos == 0
+    np.testing.assert_allclose(rb["a"][:3], td1["a"])
+    np.testing.assert_allclose(rb["a"][3:], td2["a"])
+
+
+def test_replay_buffer_add_wrap_around_from_nonzero_pos():
+    buf_size = 5
+    n_envs = 1
+    rb = ReplayBuffer(buf_size, n_envs)
+    td1 = {"a": np.random.rand(3, 1, 1)}
+    td2 = {"a": np.random.rand(4, 1, 1)}
+    rb.add(td1)
+    rb.add(td2)
+    assert rb.full
+    assert rb._pos == 2
+    np.testing.assert_allclose(rb["a"][3:], td2["a"][:2])
+    np.testing.assert_allclose(rb["a"][:2], td2["a"][2:])
+    np.testing.assert_allclose(rb["a"][2], td1["a"][2])
+
+
+@pytest.mark.parametrize("data_len", [6, 12, 13])
+def test_replay_buffer_add_oversize_from_nonzero_pos(data_len):
+    buf_size = 5
+    n_envs = 1
+    rb = ReplayBuffer(buf_size, n_envs)
+    td1 = {"a": np.random.rand(3, 1, 1)}
+    td2 = {"a": np.random.rand(data_len, 1, 1)}
+    rb.add(td1)
+    rb.add(td2)
+    assert rb.full
+    assert rb._pos == (3 + data_len) % buf_size
+    # Only the last 'buf_size' elements survive, each one at the position it would have been written to
+    for i in range(data_len - buf_size, data_len):
+        np.testing.assert_allclose(rb["a"][(3 + i) % buf_size], td2["a"][i])
+
+
 def test_replay_buffer_add_single_td_size_is_not_multiple():
     buf_size = 5
     n_envs = 1
@@ -237,7 +281,7 @@ def test_replay_buffer_sample_fail():
         rb.sample(-1)
 
 
-def test_memmap_replay_buffer():
+def test_memmap_replay_buffer(tmp_path):
     buf_size = 10
     n_envs = 4
     with pytest.raises(
@@ -245,7 +289,7 @@ def test_memmap_replay_buffer():
         match="The buffer is set to be memory-mapped but the 'memmap_dir'",
     ):
         rb = ReplayBuffer(buf_size, n_envs, memmap=True, memmap_dir=None)
-    root_dir = os.path.join("pytest_" + str(int(time.time())))
+    root_dir = str(tmp_path)
     memmap_dir = os.path.join(root_dir, "memmap_buffer")
     rb = ReplayBuffer(buf_size, n_envs, memmap=True, memmap_dir=memmap_dir)
     td = {"observations": np.random.randint(0, 256, (10, n_envs, 3, 64, 64), dtype=np.uint8)}
@@ -255,10 +299,10 @@ def test_memmap_replay_buffer():
     shutil.rmtree(root_dir)
 
 
-def test_memmap_to_file_replay_buffer():
+def test_memmap_to_file_replay_buffer(tmp_path):
     buf_size = 10
     n_envs = 4
-    root_dir = os.path.join("pytest_" + str(int(time.time())))
+    root_dir = str(tmp_path)
     memmap_dir = os.path.join(root_dir, "memmap_buffer")
     rb = ReplayBuffer(buf_size, n_envs, memmap=True, memmap_dir=memmap_dir)
     td = {"observations": np.random.randint(0, 256, (10, n_envs, 3, 64, 64), dtype=np.uint8)}
@@ -275,10 +319,10 @@ def test_memmap_to_file_replay_buffer():
     shutil.rmtree(root_dir)
 
 
-def test_obs_keys_replay_buffer():
+def test_obs_keys_replay_buffer(tmp_path):
     buf_size = 10
     n_envs = 4
-    root_dir = os.path.join("pytest_" + str(int(time.time())))
+    root_dir = str(tmp_path)
     memmap_dir = os.path.join(root_dir, "memmap_buffer")
     rb = ReplayBuffer(buf_size, n_envs, memmap=True, memmap_dir=memmap_dir, obs_keys=("rgb", "state", "tmp"))
     td = {
@@ -299,10 +343,10 @@ def test_obs_keys_replay_buffer():
     shutil.rmtree(root_dir)
 
 
-def test_obs_keys_replay_no_sample_next_obs_buffer():
+def test_obs_keys_replay_no_sample_next_obs_buffer(tmp_path):
     buf_size = 10
     n_envs = 4
-    root_dir = os.path.join("pytest_" + str(int(time.time())))
+    root_dir = str(tmp_path)
     memmap_dir = os.path.join(root_dir, "memmap_buffer")
     rb = ReplayBuffer(buf_size, n_envs, memmap=True, memmap_dir=memmap_dir, obs_keys=("rgb", "state", "tmp"))
     td = {
@@ -339,12 +383,12 @@ def test_sample_tensors():
     assert s["observations"].shape == torch.Size([3, 10, 1])
 
 
-def test_sample_tensor_memmap():
+def test_sample_tensor_memmap(tmp_path):
     import torch
 
     buf_size = 10
     n_envs = 4
-    root_dir = os.path.join("pytest_" + str(int(time.time())))
+    root_dir = str(tmp_path)
     memmap_dir = os.path.join(root_dir, "memmap_buffer")
     rb = ReplayBuffer(buf_size, n_envs, memmap=True, memmap_dir=memmap_dir, obs_keys=("observations"))
     td = {
@@ -358,12 +402,12 @@ def test_sample_tensor_memmap():
     shutil.rmtree(root_dir)
 
 
-def test_to_tensor():
+def test_to_tensor(tmp_path):
     import torch
 
     buf_size = 5
     n_envs = 4
-    root_dir = os.path.join("pytest_" + str(int(time.time())))
+    root_dir = str(tmp_path)
     memmap_dir = os.path.join(root_dir, "memmap_buffer")
     rb = ReplayBuffer(buf_size, n_envs, memmap=True, memmap_dir=memmap_dir, obs_keys=("observations"))
     td = {
@@ -400,10 +444,10 @@ def test_setitem():
     os.unlink("test.memmap")
 
 
-def test_setitem_memmap():
+def test_setitem_memmap(tmp_path):
     buf_size = 5
     n_envs = 4
-    root_dir = os.path.join("pytest_" + str(int(time.time())))
+    root_dir = str(tmp_path)
     memmap_dir = os.path.join(root_dir, "memmap_buffer")
     rb = ReplayBuffer(buf_size, n_envs, memmap=True, memmap_dir=memmap_dir, obs_keys=("observations"))
     td = {
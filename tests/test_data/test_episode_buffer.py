@@ -1,6 +1,5 @@
 import os
 import shutil
-import time
 
 import numpy as np
 import pytest
@@ -402,12 +401,12 @@ def test_sample_tensors():
     assert s["observations"].shape == torch.Size([3, 5, 10, 1])
 
 
-def test_sample_tensor_memmap():
+def test_sample_tensor_memmap(tmp_path):
     import torch
 
     buf_size = 10
     n_envs = 4
-    root_dir = os.path.join("pytest_" + str(int(time.time())))
+    root_dir = str(tmp_path)
     memmap_dir = os.path.join(root_dir, "memmap_buffer")
     rb = EpisodeBuffer(buf_size, n_envs, memmap=True, memmap_dir=memmap_dir, obs_keys=("observations"))
     td = {